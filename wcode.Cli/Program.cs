@@ -1,10 +1,22 @@
+using System.Diagnostics;
+using System.Text;
 using System.Text.Json;
+using System.Text.RegularExpressions;
 using wcode.Lib;
 
 namespace wcode.Cli;
 
 class Program
 {
+    // Streamed content is written at most this often instead of once per token
+    private const int ContentFlushIntervalMs = 50;
+    
+    private const string DefaultServerUrl = "http://192.168.0.63:11434";
+    
+    // Words that suggest a prompt will produce code, files or commands rather than a short answer; matched as
+    // whole words so that e.g. "current" or "decode" don't count
+    private static readonly Regex _longResponseKeywords = new(@"\b(write|create|implement|program|code|build|generate|run)\b", RegexOptions.IgnoreCase | RegexOptions.CultureInvariant | RegexOptions.Compiled);
+    
     static async Task<int> Main(string[] args)
     {
         try
@@ -24,6 +36,13 @@ class Program
                 return 1;
             }
             
+            var optionsError = ValidateOptions(options);
+            if (optionsError != null)
+            {
+                Console.WriteLine($"Error: {optionsError}");
+                return 1;
+            }
+            
             if (options.TestTool)
             {
                 return await RunToolTestAsync(options);
@@ -38,7 +57,7 @@ class Program
         }
     }
     
-    private static CommandLineOptions ParseCommandLineArguments(string[] args)
+    internal static CommandLineOptions ParseCommandLineArguments(string[] args)
     {
         var options = new CommandLineOptions();
         
@@ -70,6 +89,55 @@ class Program
                     options.ProjectDirectory = arg.Substring("--project-dir=".Length);
                     break;
                     
+                case "--cache-dir" when i + 1 < args.Length:
+                    options.CacheDirectory = args[i + 1];
+                    i++; // Skip next argument since we consumed it
+                    break;
+                    
+                case var arg when arg.StartsWith("--cache-dir="):
+                    options.CacheDirectory = arg.Substring("--cache-dir=".Length);
+                    break;
+                    
+                case "--semantic-cache" when i + 1 < args.Length:
+                    options.SemanticCacheModel = args[i + 1];
+                    i++; // Skip next argument since we consumed it
+                    break;
+                    
+                case var arg when arg.StartsWith("--semantic-cache="):
+                    options.SemanticCacheModel = arg.Substring("--semantic-cache=".Length);
+                    break;
+                    
+                case "--server" when i + 1 < args.Length:
+                    options.ServerUrl = args[i + 1];
+                    i++; // Skip next argument since we consumed it
+                    break;
+                    
+                case var arg when arg.StartsWith("--server="):
+                    options.ServerUrl = arg.Substring("--server=".Length);
+                    break;
+                    
+                case "--model" when i + 1 < args.Length:
+                    options.ModelName = args[i + 1];
+                    i++; // Skip next argument since we consumed it
+                    break;
+                    
+                case var arg when arg.StartsWith("--model="):
+                    options.ModelName = arg.Substring("--model=".Length);
+                    break;
+                    
+                case "--continue-conversation":
+                    options.ContinueConversation = true;
+                    break;
+                    
+                case "--parallel" when i + 1 < args.Length:
+                    options.MaxParallelPrompts = ParseParallelLimit(args[i + 1]);
+                    i++; // Skip next argument since we consumed it
+                    break;
+                    
+                case var arg when arg.StartsWith("--parallel="):
+                    options.MaxParallelPrompts = ParseParallelLimit(arg.Substring("--parallel=".Length));
+                    break;
+                    
                 case var arg when !arg.StartsWith("--"):
                     // First non-option argument is batch file, second is project directory
                     if (string.IsNullOrEmpty(options.BatchFile))
@@ -87,6 +155,37 @@ class Program
         return options;
     }
     
+    // Returns a message describing the first invalid option or combination, or null if the options can be used
+    internal static string? ValidateOptions(CommandLineOptions options)
+    {
+        if (options.MaxParallelPrompts < 1)
+        {
+            return "--parallel requires a positive number or 'all'";
+        }
+        
+        // Uri accepts "localhost:11434" as an absolute URI with scheme "localhost", so check the scheme too
+        if (options.ServerUrl != null &&
+            !(Uri.TryCreate(options.ServerUrl, UriKind.Absolute, out var serverUri) &&
+              (serverUri.Scheme == Uri.UriSchemeHttp || serverUri.Scheme == Uri.UriSchemeHttps)))
+        {
+            return $"Invalid server URL: {options.ServerUrl} (expected an http:// or https:// URL)";
+        }
+        
+        if (options.ContinueConversation && options.MaxParallelPrompts > 1)
+        {
+            return "--continue-conversation cannot be combined with --parallel";
+        }
+        
+        return null;
+    }
+    
+    // "all" means no limit; returns 0 for anything that is not a positive number so the caller can report it
+    private static int ParseParallelLimit(string value)
+    {
+        if (value.Equals("all", StringComparison.OrdinalIgnoreCase)) return int.MaxValue;
+        return int.TryParse(value, out var result) && result > 0 ? result : 0;
+    }
+    
     private static void ShowHelp()
     {
         Console.WriteLine("wcode CLI - Command line interface for LLM-assisted development");
@@ -102,6 +201,15 @@ class Program
         Console.WriteLine("Options:");
         Console.WriteLine("  --test-tool <name>       Test individual tool (read_file, write_file, list_files, search_files, get_project_structure, get_system_info)");
         Console.WriteLine("  --project-dir <path>     Project directory path (alternative to positional arg)");
+        Console.WriteLine("  --cache-dir <path>       Keep cached LLM responses for identical requests across runs");
+        Console.WriteLine("  --semantic-cache <model> Reuse responses for reworded follow-up prompts, compared with the given embedding model");
+        Console.WriteLine("  --model <name>           Model to use (default: the smallest installed model)");
+        Console.WriteLine($"  --server <url>           Ollama server or proxy URL (default: {DefaultServerUrl})");
+        Console.WriteLine("  --continue-conversation  Send all prompts as one conversation, each seeing the earlier ones");
+        Console.WriteLine("  --parallel <n|all>       Process up to n prompts (or all of them) concurrently (default: 1)");
+        Console.WriteLine("                           Set OLLAMA_NUM_PARALLEL on the server to at least n so they share a batch");
+        Console.WriteLine("                           Prompts share the project directory, so only use it for prompts that don't");
+        Console.WriteLine("                           write the same files or run conflicting commands");
         Console.WriteLine("  --help, -h               Show this help message");
         Console.WriteLine();
         Console.WriteLine("Examples:");
@@ -113,6 +221,7 @@ class Program
         Console.WriteLine("Batch file format:");
         Console.WriteLine("  Multiple prompts can be separated by double newlines (\\n\\n) or '---'");
         Console.WriteLine("  Each prompt will be processed sequentially with full tool calling support");
+        Console.WriteLine("  With --parallel, each prompt's output is printed as a block when it finishes");
     }
     
     private static async Task<int> RunBatchModeAsync(CommandLineOptions options)
@@ -165,32 +274,57 @@ class Program
         // Initialize services
         var conversationLogger = new ConversationLogger(projectPath);
         var queryService = new ProjectQueryService(projectPath);
-        var ollamaClient = new OllamaClient("192.168.0.63", 11434);
+        var serverUri = new Uri(options.ServerUrl ?? DefaultServerUrl);
+        // A batch run is short-lived, so keeping its responses in memory is bounded by the batch itself
+        var ollamaClient = new OllamaClient(serverUri, options.CacheDirectory, cacheResponsesInMemory: true);
+        if (!string.IsNullOrEmpty(options.SemanticCacheModel))
+        {
+            ollamaClient.EnableSemanticCache(options.SemanticCacheModel);
+        }
         
         try
         {
-            // Test Ollama connection
+            // Test Ollama connection and get available models in one request
             Console.WriteLine("Testing Ollama connection...");
-            if (!await ollamaClient.IsServerAvailableAsync())
+            var models = await ollamaClient.ConnectAndListModelsAsync();
+            if (models == null)
             {
-                Console.WriteLine("Error: Cannot connect to Ollama server at 192.168.0.63:11434");
+                Console.WriteLine($"Error: Cannot connect to Ollama server at {serverUri}");
                 return 1;
             }
             
-            // Get available models
-            var models = await ollamaClient.GetModelsAsync();
-            if (models == null || !models.Any())
+            if (!models.Any())
             {
                 Console.WriteLine("Error: No models available");
                 return 1;
             }
             
-            var modelName = models.First().Name;
-            Console.WriteLine($"Using model: {modelName}");
+            string modelName;
+            if (!string.IsNullOrEmpty(options.ModelName))
+            {
+                var requested = models.FirstOrDefault(m => m.Name == options.ModelName);
+                if (requested == null)
+                {
+                    Console.WriteLine($"Error: Model not found: {options.ModelName}. Available models: {string.Join(", ", models.Select(m => m.Name))}");
+                    return 1;
+                }
+                
+                modelName = requested.Name;
+                Console.WriteLine($"Using model: {modelName} ({FormatModelSize(requested.Size)})");
+            }
+            else
+            {
+                // The server's listing order is arbitrary; default to the smallest model, which is fastest to run.
+                // Models without a reported size sort last
+                var smallest = models.MinBy(m => m.Size > 0 ? m.Size : long.MaxValue)!;
+                modelName = smallest.Name;
+                Console.WriteLine($"Using model: {modelName} ({FormatModelSize(smallest.Size)}, smallest available; use --model to choose another)");
+            }
             
             // Process instructions
             Console.WriteLine("Processing instructions...");
-            await ProcessBatchInstructions(ollamaClient, queryService, conversationLogger, instructions, modelName);
+            await ProcessBatchInstructions(ollamaClient, queryService, conversationLogger, instructions, modelName, 
+                options.MaxParallelPrompts, options.ContinueConversation);
             
             Console.WriteLine("Batch processing completed successfully.");
             return 0;
@@ -198,11 +332,19 @@ class Program
         finally
         {
             ollamaClient.Dispose();
+            conversationLogger.Dispose();
         }
     }
     
+    private static string FormatModelSize(long bytes)
+    {
+        if (bytes <= 0) return "size unknown";
+        if (bytes < 1024L * 1024 * 1024) return $"{bytes / (1024.0 * 1024):F0} MB";
+        return $"{bytes / (1024.0 * 1024 * 1024):F1} GB";
+    }
+    
     private static async Task ProcessBatchInstructions(OllamaClient ollamaClient, ProjectQueryService queryService, 
-        ConversationLogger conversationLogger, string instructions, string modelName)
+        ConversationLogger conversationLogger, string instructions, string modelName, int maxParallelPrompts, bool continueConversation)
     {
         // Split instructions into individual prompts (separated by double newlines or explicit separators)
         var prompts = instructions.Split(new[] { "\n\n", "---" }, StringSplitOptions.RemoveEmptyEntries)
@@ -218,41 +360,107 @@ class Program
         
         Console.WriteLine($"Found {prompts.Length} prompt(s) to process");
         
-        for (int i = 0; i < prompts.Length; i++)
+        // Create project tools using library; the definitions are the same for every prompt
+        var tools = ProjectToolProvider.GetProjectTools(queryService);
+        var toolExecutor = new ProjectToolExecutor(queryService);
+        
+        maxParallelPrompts = Math.Min(maxParallelPrompts, prompts.Length);
+        if (maxParallelPrompts > 1)
         {
-            var prompt = prompts[i];
-            Console.WriteLine($"\n--- Processing prompt {i + 1}/{prompts.Length} ---");
-            Console.WriteLine($"Prompt: {prompt.Substring(0, Math.Min(100, prompt.Length))}...");
+            Console.WriteLine($"Processing up to {maxParallelPrompts} prompts concurrently; " +
+                $"the server decodes them together only if OLLAMA_NUM_PARALLEL is at least {maxParallelPrompts}");
+            Console.WriteLine("Warning: concurrent prompts share the project directory, so their file writes and commands can interfere");
             
-            try
-            {
-                // Create project tools using library
-                var tools = ProjectToolProvider.CreateProjectTools(queryService);
-                var toolExecutor = new ProjectToolExecutor(queryService);
-                
-                // Initialize conversation history for this prompt
-                var conversationHistory = new List<ChatMessage>();
-                
-                // Process the prompt with conversation loop
-                await ProcessPromptWithConversationLoop(ollamaClient, modelName, prompt, tools, toolExecutor, conversationHistory);
-            }
-            catch (Exception ex)
+            // Concurrent conversations would overwrite each other's debug request dumps
+            ollamaClient.DebugRequestPath = null;
+            
+            // Keep up to maxParallelPrompts requests in flight so the server's parallel slots stay busy;
+            // output is buffered per prompt so concurrent conversations don't interleave on the console
+            using var throttle = new SemaphoreSlim(maxParallelPrompts);
+            
+            // Start the prompts expected to finish quickly first, so their slots free up and their output
+            // appears without waiting behind long code-generation conversations
+            var dispatchOrder = prompts.Select((prompt, i) => (Prompt: prompt, Index: i))
+                                       .OrderBy(p => EstimateResponseCost(p.Prompt))
+                                       .ToList();
+            
+            var tasks = dispatchOrder.Select(async p =>
             {
-                Console.WriteLine($"Error processing prompt {i + 1}: {ex.Message}");
-            }
+                var (prompt, i) = p;
+                await throttle.WaitAsync();
+                try
+                {
+                    using var output = new StringWriter();
+                    await ProcessPromptAsync(ollamaClient, modelName, prompt, i, prompts.Length, tools, toolExecutor, output);
+                    Console.Write(output.ToString());
+                }
+                finally
+                {
+                    throttle.Release();
+                }
+            });
             
-            // Small delay between prompts
-            await Task.Delay(1000);
+            await Task.WhenAll(tasks);
+            return;
+        }
+        
+        // One conversation for the whole batch lets the server reuse the cached prompt prefix from the previous
+        // prompt instead of starting each one from scratch
+        var sharedHistory = continueConversation ? new List<ChatMessage>() : null;
+        
+        for (int i = 0; i < prompts.Length; i++)
+        {
+            await ProcessPromptAsync(ollamaClient, modelName, prompts[i], i, prompts.Length, tools, toolExecutor, Console.Out, sharedHistory);
+        }
+    }
+    
+    // Prompts that ask for code or files lead to long responses and tool-calling turns; otherwise longer prompts
+    // tend to need longer answers
+    internal static int EstimateResponseCost(string prompt)
+    {
+        var asksForWork = _longResponseKeywords.IsMatch(prompt);
+        return (asksForWork ? 100_000 : 0) + prompt.Length;
+    }
+    
+    internal static async Task ProcessPromptAsync(OllamaClient ollamaClient, string modelName, string prompt, int index, int count,
+        IReadOnlyList<Tool> tools, ProjectToolExecutor toolExecutor, TextWriter output, List<ChatMessage>? conversationHistory = null)
+    {
+        output.WriteLine($"\n--- Processing prompt {index + 1}/{count} ---");
+        output.WriteLine($"Prompt: {prompt.Substring(0, Math.Min(100, prompt.Length))}...");
+        
+        // Each prompt gets its own conversation unless the batch is one continuing conversation
+        var isContinuing = conversationHistory != null;
+        conversationHistory ??= new List<ChatMessage>();
+        var historyLength = conversationHistory.Count;
+        var completed = false;
+        
+        try
+        {
+            // Process the prompt with conversation loop
+            completed = await ProcessPromptWithConversationLoop(ollamaClient, modelName, prompt, tools, toolExecutor, conversationHistory, output);
+        }
+        catch (Exception ex)
+        {
+            output.WriteLine($"Error processing prompt {index + 1}: {ex.Message}");
+        }
+        
+        // An unanswered prompt would leave the next one following a user message with another user message
+        if (!completed && isContinuing)
+        {
+            conversationHistory.RemoveRange(historyLength, conversationHistory.Count - historyLength);
+            output.WriteLine($"Prompt {index + 1} was not answered, so it is left out of the continuing conversation");
         }
     }
     
-    private static async Task ProcessPromptWithConversationLoop(
+    // Returns true once the model has answered without requesting further tool calls
+    private static async Task<bool> ProcessPromptWithConversationLoop(
         OllamaClient ollamaClient, 
         string modelName, 
         string initialPrompt, 
-        List<Tool> tools, 
+        IReadOnlyList<Tool> tools, 
         ProjectToolExecutor toolExecutor, 
-        List<ChatMessage> conversationHistory)
+        List<ChatMessage> conversationHistory,
+        TextWriter output)
     {
         // Add initial user message
         conversationHistory.Add(new ChatMessage { Role = "user", Content = initialPrompt });
@@ -263,30 +471,57 @@ class Program
         while (iteration < maxIterations)
         {
             iteration++;
-            Console.WriteLine($"\n--- Conversation turn {iteration} ---");
+            output.WriteLine($"\n--- Conversation turn {iteration} ---");
             
-            // Send current conversation to LLM
+            // Send current conversation to LLM, displaying the response as it is generated
+            var printedContent = false;
+            var pendingContent = new StringBuilder();
+            var sinceFlush = Stopwatch.StartNew();
+            var diagnostics = new List<string>();
             var response = await ollamaClient.ChatWithToolsAsync(modelName, 
                 conversationHistory.Last().Content, 
                 conversationHistory.Take(conversationHistory.Count - 1).ToList(), 
-                tools);
+                tools,
+                onContent: chunk =>
+                {
+                    if (!printedContent)
+                    {
+                        pendingContent.Append("LLM Response: ");
+                        printedContent = true;
+                    }
+                    pendingContent.Append(chunk);
+                    
+                    if (sinceFlush.ElapsedMilliseconds >= ContentFlushIntervalMs)
+                    {
+                        output.Write(pendingContent);
+                        pendingContent.Clear();
+                        sinceFlush.Restart();
+                    }
+                },
+                onDiagnostic: diagnostics.Add);
             
-            if (response?.Message == null)
+            if (printedContent)
             {
-                Console.WriteLine("No response received from LLM");
-                break;
+                output.Write(pendingContent);
+                output.WriteLine();
+            }
+            
+            // Written after the content so they stay in this prompt's output, even when prompts run in parallel
+            foreach (var diagnostic in diagnostics)
+            {
+                output.WriteLine(diagnostic);
             }
             
-            // Display LLM response
-            if (!string.IsNullOrEmpty(response.Message.Content))
+            if (response?.Message == null)
             {
-                Console.WriteLine($"LLM Response: {response.Message.Content}");
+                output.WriteLine("No response received from LLM");
+                return false;
             }
             
             // Check if there are tool calls to process
             if (response.Message.ToolCalls?.Any() == true)
             {
-                Console.WriteLine($"Processing {response.Message.ToolCalls.Count} tool call(s)...");
+                output.WriteLine($"Processing {response.Message.ToolCalls.Count} tool call(s)...");
                 
                 // Add assistant message with tool calls to history
                 conversationHistory.Add(new ChatMessage 
@@ -297,7 +532,6 @@ class Program
                 });
                 
                 // Execute each tool call and add results to conversation
-                var allToolResults = new List<string>();
                 foreach (var toolCall in response.Message.ToolCalls)
                 {
                     var result = await toolExecutor.ExecuteToolCallAsync(toolCall);
@@ -309,17 +543,17 @@ class Program
                         // For run_command, show the actual output instead of just "executed successfully"
                         if (toolCall.Function.Name == "run_command")
                         {
-                            Console.WriteLine($"Tool '{toolCall.Function.Name}' output:");
-                            Console.WriteLine(result);
+                            output.WriteLine($"Tool '{toolCall.Function.Name}' output:");
+                            output.WriteLine(result);
                         }
                         else
                         {
-                            Console.WriteLine($"Tool '{toolCall.Function.Name}' executed successfully");
+                            output.WriteLine($"Tool '{toolCall.Function.Name}' executed successfully");
                         }
                     }
                     else
                     {
-                        Console.WriteLine($"Tool '{toolCall.Function.Name}' failed: {result}");
+                        output.WriteLine($"Tool '{toolCall.Function.Name}' failed: {result}");
                     }
                     
                     // Add tool result as user message
@@ -328,8 +562,6 @@ class Program
                         Role = "user", 
                         Content = $"Tool result for {toolCall.Function.Name}: {result}" 
                     });
-                    
-                    allToolResults.Add(result);
                 }
                 
                 // Continue the conversation loop to let LLM process tool results
@@ -344,15 +576,13 @@ class Program
                     Content = response.Message.Content ?? "" 
                 });
                 
-                Console.WriteLine("Conversation completed - no further tool calls needed.");
-                break;
+                output.WriteLine("Conversation completed - no further tool calls needed.");
+                return true;
             }
         }
         
-        if (iteration >= maxIterations)
-        {
-            Console.WriteLine("Warning: Reached maximum conversation iterations, stopping.");
-        }
+        output.WriteLine("Warning: Reached maximum conversation iterations, stopping.");
+        return false;
     }
     
     private static async Task<int> RunToolTestAsync(CommandLineOptions options)
@@ -480,6 +710,12 @@ public class CommandLineOptions
 {
     public string? BatchFile { get; set; }
     public string? ProjectDirectory { get; set; }
+    public string? CacheDirectory { get; set; }
+    public string? SemanticCacheModel { get; set; }
+    public string? ServerUrl { get; set; }
+    public string? ModelName { get; set; }
+    public int MaxParallelPrompts { get; set; } = 1;
+    public bool ContinueConversation { get; set; }
     public bool ShowHelp { get; set; }
     public bool TestTool { get; set; }
     public string? ToolName { get; set; }
@@ -1,23 +1,50 @@
-using System.IO;
-using System.Text.Json;
+using System.Collections.Concurrent;
+using System.Text;
 using System.Text.Json.Serialization;
-using System.Globalization;
+using System.Threading.Channels;
 
 namespace wcode.Lib;
 
-public class ConversationLogger
+public class ConversationLogger : IDisposable
 {
-    private readonly string _projectPath;
+    // Each log file is opened once and shared by every logger writing to it; the last logger to be disposed closes it
+    private static readonly Dictionary<string, AppendOnlyLogFile> _openLogFiles = new();
+    private static readonly object _openLogFilesLock = new();
+    private static readonly ConcurrentDictionary<ConversationLogger, bool> _activeLoggers = new();
+    
+    static ConversationLogger()
+    {
+        AppDomain.CurrentDomain.ProcessExit += (_, _) =>
+        {
+            // Disposing a logger drains its queued entries, then releases the files they are written to
+            foreach (var logger in _activeLoggers.Keys)
+            {
+                logger.Dispose();
+            }
+        };
+    }
+    
     private readonly string _markdownLogPath;
     private readonly string _csvLogPath;
+    private readonly AppendOnlyLogFile _markdownLog;
+    private readonly AppendOnlyLogFile _csvLog;
+    private readonly string _sessionId;
+    private readonly Channel<ConversationEntry> _pendingEntries = Channel.CreateUnbounded<ConversationEntry>(new UnboundedChannelOptions { SingleReader = true });
+    private readonly Task _writerTask;
 
     public ConversationLogger(string projectPath)
     {
-        _projectPath = projectPath;
         _markdownLogPath = Path.Combine(projectPath, "llm_conversations.md");
         _csvLogPath = Path.Combine(projectPath, "llm_conversations.csv");
+        _sessionId = CreateSessionId();
         
         InitializeLogs();
+        _markdownLog = AcquireLogFile(_markdownLogPath);
+        _csvLog = AcquireLogFile(_csvLogPath);
+        
+        // A single background writer keeps file I/O off the caller's path and preserves entry order
+        _writerTask = Task.Run(WritePendingEntriesAsync);
+        _activeLoggers[this] = true;
     }
 
     private void InitializeLogs()
@@ -37,16 +64,55 @@ public class ConversationLogger
     }
 
 
-    public async Task LogConversationAsync(string sender, string message, string model = "", int tokensUsed = 0, int responseTimeMs = 0)
+    public Task LogConversationAsync(string sender, string message, string model = "", int tokensUsed = 0, int responseTimeMs = 0)
     {
-        var timestamp = DateTime.Now;
-        var sessionId = GetCurrentSessionId();
-        
-        // Log to markdown (casual reading)
-        await LogToMarkdownAsync(sender, message, timestamp);
+        _pendingEntries.Writer.TryWrite(new ConversationEntry
+        {
+            // UTC avoids a time zone lookup per entry; the writer converts to local time
+            Timestamp = DateTime.UtcNow,
+            SessionId = _sessionId,
+            Sender = sender,
+            Message = message,
+            Model = model,
+            TokensUsed = tokensUsed,
+            ResponseTimeMs = responseTimeMs
+        });
         
-        // Log to CSV (efficient structured format)
-        await LogToCsvAsync(sender, message, timestamp, sessionId, model, tokensUsed, responseTimeMs);
+        return Task.CompletedTask;
+    }
+
+    private async Task WritePendingEntriesAsync()
+    {
+        await foreach (var entry in _pendingEntries.Reader.ReadAllAsync())
+        {
+            try
+            {
+                var timestamp = entry.Timestamp.ToLocalTime();
+                
+                // Log to markdown (casual reading)
+                await LogToMarkdownAsync(entry.Sender, entry.Message, timestamp);
+                
+                // Log to CSV (efficient structured format)
+                await LogToCsvAsync(entry.Sender, entry.Message, timestamp, entry.SessionId, entry.Model, entry.TokensUsed, entry.ResponseTimeMs);
+            }
+            catch (Exception ex)
+            {
+                System.Diagnostics.Debug.WriteLine($"Conversation logging failed: {ex.Message}");
+            }
+        }
+    }
+
+    // Waits until every entry logged so far has been written; no further entries are accepted
+    public void Dispose()
+    {
+        if (_activeLoggers.TryRemove(this, out _))
+        {
+            _pendingEntries.Writer.TryComplete();
+            _writerTask.Wait();
+            ReleaseLogFile(_markdownLog);
+            ReleaseLogFile(_csvLog);
+        }
+        GC.SuppressFinalize(this);
     }
 
     private async Task LogToMarkdownAsync(string sender, string message, DateTime timestamp)
@@ -60,7 +126,7 @@ public class ConversationLogger
 
             """;
         
-        await File.AppendAllTextAsync(_markdownLogPath, markdownEntry);
+        await _markdownLog.AppendAsync(markdownEntry);
     }
 
     private async Task LogToCsvAsync(string sender, string message, DateTime timestamp, string sessionId, string model, int tokensUsed, int responseTimeMs)
@@ -75,7 +141,7 @@ public class ConversationLogger
             
             var csvLine = $"{timestamp:yyyy-MM-ddTHH:mm:ss.fffK},{escapedSessionId},{escapedSender},{escapedMessage},{escapedModel},{tokensUsed},{responseTimeMs}\n";
             
-            await File.AppendAllTextAsync(_csvLogPath, csvLine);
+            await _csvLog.AppendAsync(csvLine);
         }
         catch (Exception ex)
         {
@@ -84,6 +150,35 @@ public class ConversationLogger
         }
     }
     
+    private static AppendOnlyLogFile AcquireLogFile(string path)
+    {
+        var fullPath = Path.GetFullPath(path);
+        
+        lock (_openLogFilesLock)
+        {
+            if (!_openLogFiles.TryGetValue(fullPath, out var logFile))
+            {
+                logFile = new AppendOnlyLogFile(fullPath);
+                _openLogFiles[fullPath] = logFile;
+            }
+            
+            logFile.ReferenceCount++;
+            return logFile;
+        }
+    }
+    
+    private static void ReleaseLogFile(AppendOnlyLogFile logFile)
+    {
+        lock (_openLogFilesLock)
+        {
+            if (--logFile.ReferenceCount > 0) return;
+            
+            _openLogFiles.Remove(logFile.FullPath);
+        }
+        
+        logFile.Dispose();
+    }
+    
     private static string EscapeCsvValue(string value)
     {
         if (string.IsNullOrEmpty(value))
@@ -99,14 +194,56 @@ public class ConversationLogger
     }
 
 
-    private string GetCurrentSessionId()
+    private static string CreateSessionId()
     {
-        // Generate a session ID based on the current date and a random component
+        // Generate a session ID once per logger based on the current date and a random component
         var dateComponent = DateTime.Now.ToString("yyyyMMdd");
         var randomComponent = Guid.NewGuid().ToString()[..8];
         return $"{dateComponent}-{randomComponent}";
     }
 
+    private sealed class AppendOnlyLogFile : IDisposable
+    {
+        private readonly FileStream _stream;
+        private readonly SemaphoreSlim _writeLock = new(1, 1);
+
+        public string FullPath { get; }
+        
+        // Number of loggers using this file; only changed while holding _openLogFilesLock
+        public int ReferenceCount { get; set; }
+
+        public AppendOnlyLogFile(string path)
+        {
+            FullPath = path;
+            
+            // Unbuffered so each entry reaches the OS as soon as it is written
+            _stream = new FileStream(path, FileMode.Append, FileAccess.Write, FileShare.ReadWrite, bufferSize: 0, useAsync: true);
+        }
+
+        public async Task AppendAsync(string text)
+        {
+            var bytes = Encoding.UTF8.GetBytes(text);
+            
+            await _writeLock.WaitAsync();
+            try
+            {
+                // Another process may have appended since our last write
+                _stream.Seek(0, SeekOrigin.End);
+                await _stream.WriteAsync(bytes);
+            }
+            finally
+            {
+                _writeLock.Release();
+            }
+        }
+
+        public void Dispose()
+        {
+            _stream.Dispose();
+            _writeLock.Dispose();
+        }
+    }
+
     public class ConversationEntry
     {
         [JsonPropertyName("timestamp")]
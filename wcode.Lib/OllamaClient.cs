@@ -1,31 +1,126 @@
-using System.Net.Http;
+using System.Buffers;
+using System.Collections.Concurrent;
+using System.Collections.Immutable;
+using System.Net;
+using System.Net.Http.Headers;
+using System.Runtime.CompilerServices;
+using System.Security.Cryptography;
 using System.Text;
 using System.Text.Json;
 using System.Text.Json.Serialization;
-using System.IO;
 
 namespace wcode.Lib;
 
 public class OllamaClient : IDisposable
 {
+    // Metadata endpoints answer quickly, so they get a much shorter budget than chat requests
+    private static readonly TimeSpan MetadataRequestTimeout = TimeSpan.FromSeconds(30);
+    private const int MaxMetadataRetries = 2;
+    // A live server answers the startup probes in milliseconds, so a dead or hung one is reported quickly
+    private static readonly TimeSpan AvailabilityProbeTimeout = TimeSpan.FromSeconds(2);
+    private const int StreamReadBufferSize = 64 * 1024;
+    
+    // Serialized tool definitions keyed by the list instance. Only immutable lists are cached, since any other list
+    // could change between requests
+    private static readonly ConditionalWeakTable<ImmutableList<Tool>, byte[]> _toolsJsonCache = new();
+    
+    // Property names and model names are pre-encoded so building a request body doesn't re-escape them on every call
+    private static readonly JsonEncodedText _modelProperty = JsonEncodedText.Encode("model");
+    private static readonly JsonEncodedText _messagesProperty = JsonEncodedText.Encode("messages");
+    private static readonly JsonEncodedText _streamProperty = JsonEncodedText.Encode("stream");
+    private static readonly JsonEncodedText _keepAliveProperty = JsonEncodedText.Encode("keep_alive");
+    private static readonly JsonEncodedText _optionsProperty = JsonEncodedText.Encode("options");
+    private static readonly JsonEncodedText _numCtxProperty = JsonEncodedText.Encode("num_ctx");
+    private static readonly JsonEncodedText _toolsProperty = JsonEncodedText.Encode("tools");
+    private static readonly ConcurrentDictionary<string, JsonEncodedText> _encodedModelNames = new();
+    
+    // One connection pool for the whole process, so every client (e.g. one per terminal tab) reuses the same
+    // warm connections instead of opening its own
+    private static readonly SocketsHttpHandler _sharedHandler = CreateHandler();
+    
     private readonly HttpClient _httpClient;
     private readonly string _baseUrl;
+    private readonly string? _cacheDirectory;
+    // Optional responses from this session keyed by request hash, checked before the disk cache. Off by default
+    // because interactive chats rarely repeat a whole history, so entries would only accumulate
+    private readonly ConcurrentDictionary<string, byte[]>? _responseCache;
+    private SemanticResponseCache? _semanticCache;
     private bool _disposed = false;
 
-    public OllamaClient(string host = "192.168.0.63", int port = 11434)
+    // How long the server keeps the model (and its cached prompt prefix) loaded after a request; null uses the server default
+    public string? KeepAlive { get; set; } = "30m";
+    
+    // Context window requested from the server; null uses the model default
+    public int? ContextLength { get; set; }
+    
+    // File that receives the last tool-calling request body for analysis; null disables it, e.g. when
+    // several conversations run at once and would overwrite each other's requests
+    public string? DebugRequestPath { get; set; } = "ollama_debug_request.json";
+
+    public OllamaClient(string host = "192.168.0.63", int port = 11434, string? cacheDirectory = null, bool cacheResponsesInMemory = false)
+        : this(new Uri($"http://{host}:{port}"), cacheDirectory, cacheResponsesInMemory)
+    {
+    }
+
+    // Use a full base URL, e.g. an HTTPS reverse proxy in front of Ollama that can negotiate HTTP/2
+    public OllamaClient(Uri baseUri, string? cacheDirectory = null, bool cacheResponsesInMemory = false)
+    {
+        _baseUrl = baseUri.GetLeftPart(UriPartial.Path).TrimEnd('/');
+        
+        if (cacheResponsesInMemory)
+        {
+            _responseCache = new ConcurrentDictionary<string, byte[]>();
+        }
+        
+        // Optional on-disk cache of responses keyed by the exact request payload
+        if (!string.IsNullOrEmpty(cacheDirectory))
+        {
+            Directory.CreateDirectory(cacheDirectory);
+            _cacheDirectory = cacheDirectory;
+        }
+        
+        // The handler is shared, so it must outlive any one client
+        _httpClient = new HttpClient(_sharedHandler, disposeHandler: false)
+        {
+            Timeout = TimeSpan.FromHours(1), // Allow longer timeouts for CPU inference
+            // Prefer HTTP/2 where the endpoint supports it (negotiated over TLS), fall back to HTTP/1.1 otherwise
+            DefaultRequestVersion = HttpVersion.Version20,
+            DefaultVersionPolicy = HttpVersionPolicy.RequestVersionOrLower
+        };
+        
+        // Every endpoint answers with JSON (NDJSON when streaming); ask explicitly for a persistent connection on HTTP/1.1
+        _httpClient.DefaultRequestHeaders.Accept.Add(new MediaTypeWithQualityHeaderValue("application/json"));
+        _httpClient.DefaultRequestHeaders.Accept.Add(new MediaTypeWithQualityHeaderValue("application/x-ndjson"));
+        _httpClient.DefaultRequestHeaders.ConnectionClose = false;
+    }
+
+    private static SocketsHttpHandler CreateHandler()
     {
-        _baseUrl = $"http://{host}:{port}";
-        _httpClient = new HttpClient
+        // Pool keep-alive connections so consecutive calls skip the TCP handshake. Idle connections are kept
+        // longer than the default minute because tool execution between conversation turns can take that long
+        return new SocketsHttpHandler
         {
-            Timeout = TimeSpan.FromHours(1) // Allow longer timeouts for CPU inference
+            PooledConnectionLifetime = TimeSpan.FromMinutes(15),
+            PooledConnectionIdleTimeout = TimeSpan.FromMinutes(5),
+            MaxConnectionsPerServer = 32,
+            // Ollama is normally on the local network, where a connection that takes longer than this isn't coming
+            ConnectTimeout = TimeSpan.FromSeconds(3),
+            // Over HTTP/2 concurrent requests share a connection; open another once its stream limit is reached
+            EnableMultipleHttp2Connections = true
         };
     }
 
+    // Also answer prompts that are paraphrases of earlier ones in the same context, judged by embedding similarity
+    public void EnableSemanticCache(string embeddingModel, double similarityThreshold = 0.92)
+    {
+        _semanticCache = new SemanticResponseCache(embeddingModel, similarityThreshold);
+    }
+
     public async Task<bool> IsServerAvailableAsync()
     {
         try
         {
-            var response = await _httpClient.GetAsync($"{_baseUrl}/api/version");
+            using var response = await GetMetadataAsync("/api/version", AvailabilityProbeTimeout, maxRetries: 0);
             return response.IsSuccessStatusCode;
         }
         catch
@@ -35,57 +130,71 @@ public class OllamaClient : IDisposable
     }
 
     public async Task<List<OllamaModel>> GetModelsAsync()
+    {
+        return await ListModelsAsync(MetadataRequestTimeout) ?? new List<OllamaModel>();
+    }
+
+    // A successful model listing also proves the server is reachable, so callers that need both
+    // can skip the separate availability probe; returns null if the server can't be reached.
+    // This runs at startup, so it gets the short probe budget rather than the general metadata one
+    public Task<List<OllamaModel>?> ConnectAndListModelsAsync()
+    {
+        return ListModelsAsync(AvailabilityProbeTimeout);
+    }
+
+    private async Task<List<OllamaModel>?> ListModelsAsync(TimeSpan timeoutPerAttempt)
     {
         try
         {
-            var response = await _httpClient.GetAsync($"{_baseUrl}/api/tags");
-            if (!response.IsSuccessStatusCode) return new List<OllamaModel>();
+            using var response = await GetMetadataAsync("/api/tags", timeoutPerAttempt, MaxMetadataRetries);
+            if (!response.IsSuccessStatusCode) return null;
 
-            var json = await response.Content.ReadAsStringAsync();
-            var result = JsonSerializer.Deserialize<ModelsResponse>(json);
+            await using var stream = await response.Content.ReadAsStreamAsync();
+            var result = await JsonSerializer.DeserializeAsync(stream, OllamaJsonContext.Default.ModelsResponse);
             return result?.Models ?? new List<OllamaModel>();
         }
         catch
         {
-            return new List<OllamaModel>();
+            return null;
         }
     }
 
-    public async Task<string> ChatAsync(string model, string message, List<ChatMessage>? previousMessages = null, List<Tool>? tools = null)
+    public async Task<string> ChatAsync(string model, string message, List<ChatMessage>? previousMessages = null, IReadOnlyList<Tool>? tools = null, bool useCache = true)
     {
         try
         {
-            var messages = new List<ChatMessage>();
-            
-            // Add previous messages if provided
-            if (previousMessages != null)
+            var messages = BuildMessages(previousMessages, message);
+            var body = BuildChatRequestBody(model, messages, false, tools);
+
+            var cacheKey = useCache && HasResponseCache ? GetCacheKey(body) : null;
+            var cachedBody = cacheKey != null ? await ReadCachedResponseAsync(cacheKey) : null;
+            if (cachedBody != null)
             {
-                messages.AddRange(previousMessages);
+                var cachedResponse = JsonSerializer.Deserialize(cachedBody, OllamaJsonContext.Default.ChatResponse);
+                return cachedResponse?.Message?.Content ?? "No response received";
             }
             
-            // Add current user message
-            messages.Add(new ChatMessage { Role = "user", Content = message });
-
-            var request = new ChatRequest
-            {
-                Model = model,
-                Messages = messages,
-                Stream = false,
-                Tools = tools
-            };
-
-            var json = JsonSerializer.Serialize(request);
-            var content = new StringContent(json, Encoding.UTF8, "application/json");
-
-            var response = await _httpClient.PostAsync($"{_baseUrl}/api/chat", content);
+            using var request = CreateChatRequestMessage(CreateJsonContent(body));
+            using var response = await _httpClient.SendAsync(request);
             
             if (!response.IsSuccessStatusCode)
             {
                 return $"Error: Server returned {response.StatusCode}";
             }
 
-            var responseJson = await response.Content.ReadAsStringAsync();
-            var chatResponse = JsonSerializer.Deserialize<ChatResponse>(responseJson);
+            var responseBody = await response.Content.ReadAsByteArrayAsync();
+            var chatResponse = JsonSerializer.Deserialize(responseBody, OllamaJsonContext.Default.ChatResponse);
+            
+            if (chatResponse?.Error != null)
+            {
+                return $"Error: {chatResponse.Error}";
+            }
+            
+            // Only complete replies are worth answering from the cache later
+            if (cacheKey != null && chatResponse?.Done == true)
+            {
+                await WriteCachedResponseAsync(cacheKey, responseBody);
+            }
             
             return chatResponse?.Message?.Content ?? "No response received";
         }
@@ -103,55 +212,94 @@ public class OllamaClient : IDisposable
         }
     }
 
-    public async Task<ChatResponse?> ChatWithToolsAsync(string model, string message, List<ChatMessage>? previousMessages = null, List<Tool>? tools = null)
+    public async Task<ChatResponse?> ChatWithToolsAsync(string model, string message, List<ChatMessage>? previousMessages = null, IReadOnlyList<Tool>? tools = null, bool useCache = true, Action<string>? onContent = null, Action<string>? onDiagnostic = null)
     {
+        // Diagnostics go to the console unless the caller collects them with the rest of its output
+        onDiagnostic ??= Console.WriteLine;
+        
         try
         {
-            var messages = new List<ChatMessage>();
-            
-            // Add previous messages if provided
-            if (previousMessages != null)
-            {
-                messages.AddRange(previousMessages);
-            }
-            
-            // Add current user message
-            messages.Add(new ChatMessage { Role = "user", Content = message });
+            var messages = BuildMessages(previousMessages, message);
 
-            var request = new ChatRequest
-            {
-                Model = model,
-                Messages = messages,
-                Stream = false,
-                Tools = tools
-            };
-
-            var json = JsonSerializer.Serialize(request, new JsonSerializerOptions { WriteIndented = true });
+            // Stream the response so content can be shown while the model is still generating
+            var body = BuildChatRequestBody(model, messages, true, tools);
             
             // Debug: Log the actual JSON being sent to Ollama
-            System.Diagnostics.Debug.WriteLine($"Sending to Ollama: {json}");
+            System.Diagnostics.Debug.WriteLine($"Sending to Ollama: {Encoding.UTF8.GetString(body)}");
             
             // Also write to debug file for analysis
-            try
+            if (DebugRequestPath != null)
             {
-                await File.WriteAllTextAsync("ollama_debug_request.json", json);
+                try
+                {
+                    await File.WriteAllBytesAsync(DebugRequestPath, body);
+                }
+                catch
+                {
+                    // Ignore file write errors
+                }
             }
-            catch
+            
+            // Identical requests (model, history and tool definitions) can be answered from the cache
+            var cacheKey = useCache && HasResponseCache ? GetCacheKey(body) : null;
+            var cachedBody = cacheKey != null ? await ReadCachedResponseAsync(cacheKey) : null;
+            
+            // On an exact miss, look for an earlier prompt with the same history and tools that means the same thing
+            var contextKey = cachedBody == null && useCache && _semanticCache != null ? GetSemanticContextKey(model, previousMessages, tools) : null;
+            float[]? promptEmbedding = null;
+            if (contextKey != null)
             {
-                // Ignore file write errors
+                promptEmbedding = await GetEmbeddingAsync(_semanticCache!.EmbeddingModel, message);
+                
+                if (promptEmbedding != null)
+                {
+                    cachedBody = _semanticCache.Find(contextKey, promptEmbedding);
+                }
             }
             
-            var content = new StringContent(json, Encoding.UTF8, "application/json");
-
-            var response = await _httpClient.PostAsync($"{_baseUrl}/api/chat", content);
-            
-            if (!response.IsSuccessStatusCode)
+            ChatResponse? chatResponse;
+            if (cachedBody != null)
             {
-                return null;
+                chatResponse = JsonSerializer.Deserialize(cachedBody, OllamaJsonContext.Default.ChatResponse);
+                
+                if (onContent != null && !string.IsNullOrEmpty(chatResponse?.Message?.Content))
+                {
+                    onContent(chatResponse.Message.Content);
+                }
             }
+            else
+            {
+                // HttpClient.Timeout stops applying once the headers arrive, so bound the body read as well
+                using var timeout = new CancellationTokenSource(_httpClient.Timeout);
+                using var request = CreateChatRequestMessage(CreateJsonContent(body));
+                using var response = await _httpClient.SendAsync(request, HttpCompletionOption.ResponseHeadersRead, timeout.Token);
+                
+                if (!response.IsSuccessStatusCode)
+                {
+                    return null;
+                }
 
-            var responseJson = await response.Content.ReadAsStringAsync();
-            var chatResponse = JsonSerializer.Deserialize<ChatResponse>(responseJson);
+                await using var stream = await response.Content.ReadAsStreamAsync(timeout.Token);
+                chatResponse = await ReadStreamedChatResponseAsync(stream, onContent, timeout.Token);
+                
+                // A failed or truncated stream must not be reported as a reply, let alone cached as one
+                if (chatResponse == null)
+                {
+                    return null;
+                }
+                
+                var responseBody = JsonSerializer.SerializeToUtf8Bytes(chatResponse, OllamaJsonContext.Default.ChatResponse);
+                
+                if (cacheKey != null)
+                {
+                    await WriteCachedResponseAsync(cacheKey, responseBody);
+                }
+                
+                if (contextKey != null && promptEmbedding != null)
+                {
+                    _semanticCache!.Add(contextKey, promptEmbedding, responseBody);
+                }
+            }
             
             // Check if tool calls are embedded in content as JSON text
             if (chatResponse?.Message != null && 
@@ -160,68 +308,17 @@ public class OllamaClient : IDisposable
             {
                 try
                 {
-                    var toolCalls = new List<ToolCall>();
-                    var messageContent = chatResponse.Message.Content.Trim();
-                    
-                    // Handle multiple JSON objects - split by lines and try to parse each
-                    var lines = messageContent.Split('\n', StringSplitOptions.RemoveEmptyEntries);
-                    var currentJson = "";
-                    var braceCount = 0;
-                    
-                    foreach (var line in lines)
-                    {
-                        var trimmedLine = line.Trim();
-                        if (string.IsNullOrEmpty(trimmedLine)) continue;
-                        
-                        currentJson += trimmedLine;
-                        
-                        // Count braces to find complete JSON objects
-                        foreach (var c in trimmedLine)
-                        {
-                            if (c == '{') braceCount++;
-                            else if (c == '}') braceCount--;
-                        }
-                        
-                        // When braces are balanced, we have a complete JSON object
-                        if (braceCount == 0 && !string.IsNullOrEmpty(currentJson))
-                        {
-                            try
-                            {
-                                var toolCallData = JsonSerializer.Deserialize<JsonElement>(currentJson);
-                                if (toolCallData.TryGetProperty("name", out var nameElement) && 
-                                    toolCallData.TryGetProperty("arguments", out var argsElement))
-                                {
-                                    var toolCall = new ToolCall
-                                    {
-                                        Id = Guid.NewGuid().ToString(),
-                                        Type = "function",
-                                        Function = new ToolCallFunction
-                                        {
-                                            Name = nameElement.GetString() ?? string.Empty,
-                                            Arguments = argsElement
-                                        }
-                                    };
-                                    toolCalls.Add(toolCall);
-                                }
-                            }
-                            catch (JsonException)
-                            {
-                                // This JSON object is invalid, skip it
-                            }
-                            
-                            currentJson = "";
-                        }
-                    }
+                    var toolCalls = ParseToolCallsFromContent(chatResponse.Message.Content);
                     
                     if (toolCalls.Count > 0)
                     {
                         chatResponse.Message.ToolCalls = toolCalls;
-                        Console.WriteLine($"[DEBUG] Parsed {toolCalls.Count} tool calls from content");
+                        onDiagnostic($"[DEBUG] Parsed {toolCalls.Count} tool calls from content");
                     }
                 }
                 catch (Exception ex)
                 {
-                    Console.WriteLine($"[DEBUG] Error parsing tool calls from content: {ex.Message}");
+                    onDiagnostic($"[DEBUG] Error parsing tool calls from content: {ex.Message}");
                 }
             }
             
@@ -233,79 +330,432 @@ public class OllamaClient : IDisposable
         }
     }
 
-    public async IAsyncEnumerable<string> ChatStreamAsync(string model, string message, List<ChatMessage>? previousMessages = null, List<Tool>? tools = null)
+    public async Task<float[]?> GetEmbeddingAsync(string model, string text)
     {
-        var messages = new List<ChatMessage>();
-        
-        // Add previous messages if provided
-        if (previousMessages != null)
+        try
         {
-            messages.AddRange(previousMessages);
+            var request = new EmbedRequest { Model = model, Input = text };
+            var content = CreateJsonContent(JsonSerializer.SerializeToUtf8Bytes(request, OllamaJsonContext.Default.EmbedRequest));
+            
+            using var response = await _httpClient.PostAsync($"{_baseUrl}/api/embed", content);
+            if (!response.IsSuccessStatusCode) return null;
+            
+            await using var stream = await response.Content.ReadAsStreamAsync();
+            var result = await JsonSerializer.DeserializeAsync(stream, OllamaJsonContext.Default.EmbedResponse);
+            return result?.Embeddings.FirstOrDefault();
         }
-        
-        // Add current user message
-        messages.Add(new ChatMessage { Role = "user", Content = message });
-
-        var request = new ChatRequest
+        catch
         {
-            Model = model,
-            Messages = messages,
-            Stream = true,
-            Tools = tools
-        };
+            return null;
+        }
+    }
 
-        var json = JsonSerializer.Serialize(request);
-        var content = new StringContent(json, Encoding.UTF8, "application/json");
+    public async IAsyncEnumerable<string> ChatStreamAsync(string model, string message, List<ChatMessage>? previousMessages = null, IReadOnlyList<Tool>? tools = null)
+    {
+        var messages = BuildMessages(previousMessages, message);
+        var body = BuildChatRequestBody(model, messages, true, tools);
+
+        // Read the body as it arrives instead of waiting for the whole response to be generated;
+        // HttpClient.Timeout stops applying once the headers arrive, so bound the body read as well
+        using var timeout = new CancellationTokenSource(_httpClient.Timeout);
+        using var httpRequest = CreateChatRequestMessage(CreateJsonContent(body));
+        using var response = await _httpClient.SendAsync(httpRequest, HttpCompletionOption.ResponseHeadersRead, timeout.Token);
+        
+        if (!response.IsSuccessStatusCode)
+        {
+            yield return $"Error: Server returned {response.StatusCode}";
+            yield break;
+        }
 
-        HttpResponseMessage? response = null;
-        Stream? stream = null;
-        StreamReader? reader = null;
+        await using var stream = await response.Content.ReadAsStreamAsync(timeout.Token);
         
-        try
+        await foreach (var chunk in ReadChatChunksAsync(stream, timeout.Token))
         {
-            response = await _httpClient.PostAsync($"{_baseUrl}/api/chat", content);
-            
-            if (!response.IsSuccessStatusCode)
+            // Errors during generation arrive as a chunk on an otherwise successful response
+            if (chunk.Error != null)
             {
-                yield return $"Error: Server returned {response.StatusCode}";
+                yield return $"Error: {chunk.Error}";
                 yield break;
             }
+            
+            if (chunk.Message?.Content != null)
+            {
+                yield return chunk.Message.Content;
+            }
+            
+            if (chunk.Done)
+            {
+                break;
+            }
+        }
+    }
+
+    private static ByteArrayContent CreateJsonContent(byte[] body)
+    {
+        var content = new ByteArrayContent(body);
+        content.Headers.ContentType = new MediaTypeHeaderValue("application/json") { CharSet = "utf-8" };
+        return content;
+    }
+
+    private HttpRequestMessage CreateChatRequestMessage(HttpContent content)
+    {
+        // HttpClient only applies its default version to requests it creates itself
+        return new HttpRequestMessage(HttpMethod.Post, $"{_baseUrl}/api/chat")
+        {
+            Content = content,
+            Version = _httpClient.DefaultRequestVersion,
+            VersionPolicy = _httpClient.DefaultVersionPolicy
+        };
+    }
 
-            stream = await response.Content.ReadAsStreamAsync();
-            reader = new StreamReader(stream);
+    internal static async IAsyncEnumerable<ChatResponse> ReadChatChunksAsync(Stream stream, [EnumeratorCancellation] CancellationToken cancellationToken = default, ArrayPool<byte>? bufferPool = null)
+    {
+        // Split the NDJSON stream on raw bytes and parse each line straight from the buffer, skipping the
+        // UTF-8 decode into strings. Reads return as soon as data arrives, so a large buffer doesn't delay
+        // the first token. The buffer is pooled, so a stream costs no allocations beyond the parsed chunks
+        var pool = bufferPool ?? ArrayPool<byte>.Shared;
+        var buffer = pool.Rent(StreamReadBufferSize);
+        try
+        {
+            var start = 0;
+            var end = 0;
 
-            string? line;
-            while ((line = await reader.ReadLineAsync()) != null)
+            while (true)
             {
-                if (string.IsNullOrWhiteSpace(line)) continue;
+                int newline;
+                while ((newline = Array.IndexOf(buffer, (byte)'\n', start, end - start)) >= 0)
+                {
+                    var chunk = ParseChatChunk(buffer.AsSpan(start, newline - start));
+                    start = newline + 1;
 
-                ChatStreamResponse? streamResponse = null;
-                try
+                    if (chunk != null)
+                    {
+                        yield return chunk;
+                    }
+                }
+
+                // Keep the partial line at the front of the buffer, growing it if one line fills the whole buffer
+                if (start > 0)
                 {
-                    streamResponse = JsonSerializer.Deserialize<ChatStreamResponse>(line);
+                    Buffer.BlockCopy(buffer, start, buffer, 0, end - start);
+                    end -= start;
+                    start = 0;
                 }
-                catch (JsonException)
+                if (end == buffer.Length)
                 {
-                    // Skip malformed JSON lines
-                    continue;
+                    var larger = pool.Rent(buffer.Length * 2);
+                    Buffer.BlockCopy(buffer, 0, larger, 0, end);
+                    pool.Return(buffer);
+                    buffer = larger;
                 }
 
-                if (streamResponse?.Message?.Content != null)
+                var read = await stream.ReadAsync(buffer.AsMemory(end), cancellationToken);
+                if (read == 0) break;
+                end += read;
+            }
+
+            // The final line need not be newline-terminated
+            var last = ParseChatChunk(buffer.AsSpan(0, end));
+            if (last != null)
+            {
+                yield return last;
+            }
+        }
+        finally
+        {
+            pool.Return(buffer);
+        }
+    }
+
+    private static ChatResponse? ParseChatChunk(ReadOnlySpan<byte> line)
+    {
+        line = line.Trim(" \t\r\n"u8);
+        if (line.IsEmpty) return null;
+
+        try
+        {
+            return JsonSerializer.Deserialize(line, OllamaJsonContext.Default.ChatResponse);
+        }
+        catch (JsonException)
+        {
+            // Skip malformed JSON lines
+            return null;
+        }
+    }
+
+    // Returns null if the server reports an error or the stream ends before the final chunk
+    internal static async Task<ChatResponse?> ReadStreamedChatResponseAsync(Stream stream, Action<string>? onContent, CancellationToken cancellationToken = default)
+    {
+        var role = "assistant";
+        var content = new StringBuilder();
+        var toolCalls = new List<ToolCall>();
+        var done = false;
+        
+        await foreach (var chunk in ReadChatChunksAsync(stream, cancellationToken))
+        {
+            // Ollama reports failures during generation as an error chunk on a 200 response
+            if (chunk.Error != null)
+            {
+                return null;
+            }
+            
+            if (chunk.Message != null)
+            {
+                if (!string.IsNullOrEmpty(chunk.Message.Role))
+                {
+                    role = chunk.Message.Role;
+                }
+                
+                if (!string.IsNullOrEmpty(chunk.Message.Content))
                 {
-                    yield return streamResponse.Message.Content;
+                    content.Append(chunk.Message.Content);
+                    onContent?.Invoke(chunk.Message.Content);
                 }
                 
-                if (streamResponse?.Done == true)
+                // Tool calls arrive as complete objects, usually in a single chunk
+                if (chunk.Message.ToolCalls != null)
                 {
-                    break;
+                    toolCalls.AddRange(chunk.Message.ToolCalls);
                 }
             }
+            
+            if (chunk.Done)
+            {
+                done = true;
+                break;
+            }
         }
-        finally
+        
+        if (!done)
+        {
+            return null;
+        }
+        
+        return new ChatResponse
+        {
+            Message = new ChatMessage
+            {
+                Role = role,
+                Content = content.ToString(),
+                ToolCalls = toolCalls.Count > 0 ? toolCalls : null
+            },
+            Done = true
+        };
+    }
+
+    private async Task<HttpResponseMessage> GetMetadataAsync(string path, TimeSpan timeoutPerAttempt, int maxRetries)
+    {
+        for (int attempt = 0; ; attempt++)
+        {
+            using var timeout = new CancellationTokenSource(timeoutPerAttempt);
+            var response = await _httpClient.GetAsync($"{_baseUrl}{path}", timeout.Token);
+            
+            if (attempt >= maxRetries || !IsTransientStatus(response.StatusCode))
+            {
+                return response;
+            }
+            
+            // Back off briefly before retrying a gateway or overload error
+            response.Dispose();
+            await Task.Delay(TimeSpan.FromMilliseconds(200 << attempt));
+        }
+    }
+
+    private static bool IsTransientStatus(HttpStatusCode statusCode)
+    {
+        return statusCode is HttpStatusCode.BadGateway or HttpStatusCode.ServiceUnavailable or HttpStatusCode.GatewayTimeout;
+    }
+
+    // Some models emit tool calls as JSON objects in the message text instead of structured tool_calls
+    public static List<ToolCall> ParseToolCallsFromContent(string content)
+    {
+        var toolCalls = new List<ToolCall>();
+        
+        // Most responses are plain text; skip them without splitting or attempting a parse
+        if (content.IndexOf('{') < 0)
         {
-            reader?.Dispose();
-            stream?.Dispose();
-            response?.Dispose();
+            return toolCalls;
+        }
+        
+        // Handle multiple JSON objects - split by lines and try to parse each
+        var lines = content.Trim().Split('\n', StringSplitOptions.RemoveEmptyEntries);
+        var currentJson = new StringBuilder();
+        var braceCount = 0;
+        
+        foreach (var line in lines)
+        {
+            var trimmedLine = line.Trim();
+            if (string.IsNullOrEmpty(trimmedLine)) continue;
+            
+            currentJson.Append(trimmedLine);
+            
+            // Count braces to find complete JSON objects
+            foreach (var c in trimmedLine)
+            {
+                if (c == '{') braceCount++;
+                else if (c == '}') braceCount--;
+            }
+            
+            // When braces are balanced, we have a complete JSON object
+            if (braceCount == 0 && currentJson.Length > 0)
+            {
+                // Only text that starts like an object can be a tool call; anything else would just throw in the parser
+                if (currentJson[0] == '{')
+                {
+                    try
+                    {
+                        using var document = JsonDocument.Parse(currentJson.ToString());
+                        var toolCallData = document.RootElement;
+                        if (toolCallData.ValueKind == JsonValueKind.Object &&
+                            toolCallData.TryGetProperty("name", out var nameElement) && 
+                            toolCallData.TryGetProperty("arguments", out var argsElement))
+                        {
+                            toolCalls.Add(new ToolCall
+                            {
+                                Id = Guid.NewGuid().ToString(),
+                                Type = "function",
+                                Function = new ToolCallFunction
+                                {
+                                    Name = nameElement.GetString() ?? string.Empty,
+                                    Arguments = argsElement.Clone()
+                                }
+                            });
+                        }
+                    }
+                    catch (JsonException)
+                    {
+                        // This JSON object is invalid, skip it
+                    }
+                }
+                
+                currentJson.Clear();
+            }
+        }
+        
+        return toolCalls;
+    }
+
+    private static List<ChatMessage> BuildMessages(List<ChatMessage>? previousMessages, string message)
+    {
+        var messages = new List<ChatMessage>();
+        
+        // Add previous messages if provided
+        if (previousMessages != null)
+        {
+            messages.AddRange(previousMessages);
+        }
+        
+        // Add current user message
+        messages.Add(new ChatMessage { Role = "user", Content = message });
+        return messages;
+    }
+
+    private byte[] BuildChatRequestBody(string model, List<ChatMessage> messages, bool stream, IReadOnlyList<Tool>? tools)
+    {
+        var toolsJson = tools switch
+        {
+            null => null,
+            ImmutableList<Tool> immutableTools => _toolsJsonCache.GetValue(immutableTools, t => JsonSerializer.SerializeToUtf8Bytes<IReadOnlyList<Tool>>(t, OllamaJsonContext.Default.IReadOnlyListTool)),
+            _ => JsonSerializer.SerializeToUtf8Bytes(tools, OllamaJsonContext.Default.IReadOnlyListTool)
+        };
+        
+        // Size the buffer up front so a long history or large tool list doesn't cause repeated regrowth
+        var estimatedSize = 256 + (toolsJson?.Length ?? 0);
+        foreach (var message in messages)
+        {
+            estimatedSize += 64 + (message.Content?.Length ?? 0);
+        }
+        
+        var buffer = new ArrayBufferWriter<byte>(estimatedSize);
+        using (var writer = new Utf8JsonWriter(buffer))
+        {
+            writer.WriteStartObject();
+            writer.WriteString(_modelProperty, _encodedModelNames.GetOrAdd(model, m => JsonEncodedText.Encode(m)));
+            writer.WritePropertyName(_messagesProperty);
+            JsonSerializer.Serialize(writer, messages, OllamaJsonContext.Default.ListChatMessage);
+            writer.WriteBoolean(_streamProperty, stream);
+            
+            if (KeepAlive != null)
+            {
+                writer.WriteString(_keepAliveProperty, KeepAlive);
+            }
+            
+            if (ContextLength != null)
+            {
+                writer.WriteStartObject(_optionsProperty);
+                writer.WriteNumber(_numCtxProperty, ContextLength.Value);
+                writer.WriteEndObject();
+            }
+            
+            if (toolsJson != null)
+            {
+                // The tool schemas are the largest part of the payload, so splice in the pre-serialized bytes
+                writer.WritePropertyName(_toolsProperty);
+                writer.WriteRawValue(toolsJson, skipInputValidation: true);
+            }
+            
+            writer.WriteEndObject();
+        }
+        
+        return buffer.WrittenSpan.ToArray();
+    }
+
+    // Prompts are only compared within one conversation, identified by everything sent before them. The first
+    // prompt of a conversation has no history, so unrelated opening prompts would share a context; they are not
+    // cached semantically
+    internal string? GetSemanticContextKey(string model, List<ChatMessage>? previousMessages, IReadOnlyList<Tool>? tools)
+    {
+        if (previousMessages == null || previousMessages.Count == 0) return null;
+        
+        return GetCacheKey(BuildChatRequestBody(model, previousMessages, true, tools));
+    }
+
+    private static string GetCacheKey(byte[] requestBody)
+    {
+        return Convert.ToHexString(SHA256.HashData(requestBody));
+    }
+
+    private bool HasResponseCache => _responseCache != null || _cacheDirectory != null;
+
+    private async Task<byte[]?> ReadCachedResponseAsync(string cacheKey)
+    {
+        if (_responseCache != null && _responseCache.TryGetValue(cacheKey, out var cached)) return cached;
+        if (_cacheDirectory == null) return null;
+        
+        var path = Path.Combine(_cacheDirectory, cacheKey + ".json");
+        try
+        {
+            if (!File.Exists(path)) return null;
+            
+            var responseBody = await File.ReadAllBytesAsync(path);
+            if (_responseCache != null)
+            {
+                _responseCache[cacheKey] = responseBody;
+            }
+            return responseBody;
+        }
+        catch
+        {
+            // Treat unreadable cache entries as misses
+            return null;
+        }
+    }
+
+    private async Task WriteCachedResponseAsync(string cacheKey, byte[] responseBody)
+    {
+        if (_responseCache != null)
+        {
+            _responseCache[cacheKey] = responseBody;
+        }
+        if (_cacheDirectory == null) return;
+        
+        try
+        {
+            await File.WriteAllBytesAsync(Path.Combine(_cacheDirectory, cacheKey + ".json"), responseBody);
+        }
+        catch
+        {
+            // Ignore cache write errors
         }
     }
 
@@ -333,21 +783,6 @@ public class ChatMessage
     public List<ToolCall>? ToolCalls { get; set; }
 }
 
-public class ChatRequest
-{
-    [JsonPropertyName("model")]
-    public string Model { get; set; } = string.Empty;
-    
-    [JsonPropertyName("messages")]
-    public List<ChatMessage> Messages { get; set; } = new();
-    
-    [JsonPropertyName("stream")]
-    public bool Stream { get; set; } = false;
-    
-    [JsonPropertyName("tools")]
-    public List<Tool>? Tools { get; set; }
-}
-
 public class ChatResponse
 {
     [JsonPropertyName("message")]
@@ -355,15 +790,25 @@ public class ChatResponse
     
     [JsonPropertyName("done")]
     public bool Done { get; set; }
+    
+    [JsonPropertyName("error")]
+    [JsonIgnore(Condition = JsonIgnoreCondition.WhenWritingNull)]
+    public string? Error { get; set; }
 }
 
-public class ChatStreamResponse
+public class EmbedRequest
 {
-    [JsonPropertyName("message")]
-    public ChatMessage? Message { get; set; }
+    [JsonPropertyName("model")]
+    public string Model { get; set; } = string.Empty;
     
-    [JsonPropertyName("done")]
-    public bool Done { get; set; }
+    [JsonPropertyName("input")]
+    public string Input { get; set; } = string.Empty;
+}
+
+public class EmbedResponse
+{
+    [JsonPropertyName("embeddings")]
+    public List<float[]> Embeddings { get; set; } = new();
 }
 
 public class OllamaModel
@@ -424,4 +869,15 @@ public class ToolCallFunction
     
     [JsonPropertyName("arguments")]
     public JsonElement Arguments { get; set; }
+}
+
+// Source-generated serialization metadata so requests and responses are handled without runtime reflection
+[JsonSerializable(typeof(List<ChatMessage>))]
+[JsonSerializable(typeof(IReadOnlyList<Tool>))]
+[JsonSerializable(typeof(ChatResponse))]
+[JsonSerializable(typeof(ModelsResponse))]
+[JsonSerializable(typeof(EmbedRequest))]
+[JsonSerializable(typeof(EmbedResponse))]
+internal partial class OllamaJsonContext : JsonSerializerContext
+{
 }
\ No newline at end of file
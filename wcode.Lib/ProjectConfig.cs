@@ -1,4 +1,3 @@
-using System.IO;
 using System.Text.Json;
 using System.Text.Json.Serialization;
 
@@ -18,6 +17,8 @@ public class ProjectConfig
     [JsonPropertyName("loggingEnabled")]
     public bool LoggingEnabled { get; set; } = true;
 
+    private static readonly JsonSerializerOptions _jsonOptions = new() { WriteIndented = true };
+
     private static string ConfigFilePath => Path.Combine(
         Environment.GetFolderPath(Environment.SpecialFolder.ApplicationData), 
         "wcode", 
@@ -59,11 +60,7 @@ public class ProjectConfig
             LastOpened = DateTime.Now;
 
             // Serialize and save
-            var options = new JsonSerializerOptions
-            {
-                WriteIndented = true
-            };
-            var json = JsonSerializer.Serialize(this, options);
+            var json = JsonSerializer.Serialize(this, _jsonOptions);
             File.WriteAllText(ConfigFilePath, json);
         }
         catch (Exception ex)
@@ -1,11 +1,18 @@
-using System.IO;
-using System.Text.Json;
-using System.Text.Json.Serialization;
+using System.Text;
 
 namespace wcode.Lib;
 
 public class ProjectQueryService
 {
+    // Built once and matched case-insensitively; this check runs for every file a search visits
+    private static readonly HashSet<string> _textExtensions = new(StringComparer.OrdinalIgnoreCase)
+    {
+        ".cs", ".cpp", ".c", ".h", ".hpp", ".java", ".js", ".ts", ".py", ".rb", ".php",
+        ".html", ".htm", ".css", ".scss", ".sass", ".xml", ".json", ".yaml", ".yml",
+        ".txt", ".md", ".sql", ".sh", ".bat", ".ps1", ".vb", ".fs", ".go", ".rs",
+        ".swift", ".kt", ".scala", ".clj", ".pl", ".r", ".m", ".mm", ".xaml", ".config"
+    };
+    
     private readonly string _projectPath;
     private readonly ProjectConfig _projectConfig;
 
@@ -212,7 +219,7 @@ public class ProjectQueryService
         }
 
         var relativePath = Path.GetRelativePath(_projectPath, directory);
-        var result = new System.Text.StringBuilder();
+        var result = new StringBuilder();
         result.AppendLine($"Contents of {(relativePath == "." ? "project root" : relativePath)}:");
         result.AppendLine();
         
@@ -291,29 +298,29 @@ public class ProjectQueryService
             return new QueryResult { Success = false, Message = $"Search failed: {ex.Message}" };
         }
 
-        var message = $"Search results for '{searchTerm}':\n\n";
+        var message = new StringBuilder($"Search results for '{searchTerm}':\n\n");
         if (results.Any())
         {
             foreach (var result in results.Take(20)) // Limit results
             {
-                message += $"📄 {result.FilePath}:{result.LineNumber}\n";
-                message += $"   {result.LineContent}\n\n";
+                message.Append($"📄 {result.FilePath}:{result.LineNumber}\n");
+                message.Append($"   {result.LineContent}\n\n");
             }
             
             if (results.Count > 20)
             {
-                message += $"... and {results.Count - 20} more results";
+                message.Append($"... and {results.Count - 20} more results");
             }
         }
         else
         {
-            message += "No results found.";
+            message.Append("No results found.");
         }
 
         return new QueryResult 
         { 
             Success = true, 
-            Message = message,
+            Message = message.ToString(),
             Data = new { SearchTerm = searchTerm, Results = results.Take(20).ToArray() }
         };
     }
@@ -393,24 +400,24 @@ public class ProjectQueryService
             return new QueryResult { Success = false, Message = $"Function search failed: {ex.Message}" };
         }
 
-        var message = $"Function '{functionName}' found in:\n\n";
+        var message = new StringBuilder($"Function '{functionName}' found in:\n\n");
         if (results.Any())
         {
             foreach (var result in results)
             {
-                message += $"📄 {result.FilePath}:{result.LineNumber}\n";
-                message += $"   {result.LineContent}\n\n";
+                message.Append($"📄 {result.FilePath}:{result.LineNumber}\n");
+                message.Append($"   {result.LineContent}\n\n");
             }
         }
         else
         {
-            message += "Function not found.";
+            message.Append("Function not found.");
         }
 
         return new QueryResult 
         { 
             Success = true, 
-            Message = message,
+            Message = message.ToString(),
             Data = new { FunctionName = functionName, Results = results.ToArray() }
         };
     }
@@ -471,7 +478,7 @@ public class ProjectQueryService
     {
         if (currentDepth >= maxDepth) return "";
         
-        var result = new System.Text.StringBuilder();
+        var result = new StringBuilder();
         
         try
         {
@@ -503,16 +510,7 @@ public class ProjectQueryService
 
     private bool IsTextFile(string filePath)
     {
-        var extension = Path.GetExtension(filePath).ToLower();
-        var textExtensions = new[]
-        {
-            ".cs", ".cpp", ".c", ".h", ".hpp", ".java", ".js", ".ts", ".py", ".rb", ".php",
-            ".html", ".htm", ".css", ".scss", ".sass", ".xml", ".json", ".yaml", ".yml",
-            ".txt", ".md", ".sql", ".sh", ".bat", ".ps1", ".vb", ".fs", ".go", ".rs",
-            ".swift", ".kt", ".scala", ".clj", ".pl", ".r", ".m", ".mm", ".xaml", ".config"
-        };
-        
-        return textExtensions.Contains(extension);
+        return _textExtensions.Contains(Path.GetExtension(filePath));
     }
 
     private string FormatFileSize(long bytes)
@@ -4,6 +4,23 @@ namespace wcode.Lib;
 
 public class ProjectToolExecutor
 {
+    // Case-insensitive lookup avoids lowercasing the language on every command
+    private static readonly Dictionary<string, string> _dockerImages = new(StringComparer.OrdinalIgnoreCase)
+    {
+        ["python"] = "python:3.11-slim",
+        ["node"] = "node:18-alpine",
+        ["javascript"] = "node:18-alpine",
+        ["java"] = "openjdk:11-jre-slim",
+        ["go"] = "golang:1.21-alpine",
+        ["rust"] = "rust:1.70-slim",
+        ["ruby"] = "ruby:3.0-alpine",
+        ["php"] = "php:8.1-cli-alpine",
+        ["c"] = "gcc:latest",
+        ["cpp"] = "gcc:latest",
+        ["bash"] = "ubuntu:22.04",
+        ["shell"] = "ubuntu:22.04"
+    };
+    
     private readonly ProjectQueryService? _queryService;
     
     public ProjectToolExecutor(ProjectQueryService? queryService = null)
@@ -192,21 +209,6 @@ public class ProjectToolExecutor
     
     private string GetDockerImage(string language)
     {
-        return language.ToLower() switch
-        {
-            "python" => "python:3.11-slim",
-            "node" => "node:18-alpine",
-            "javascript" => "node:18-alpine",
-            "java" => "openjdk:11-jre-slim",
-            "go" => "golang:1.21-alpine",
-            "rust" => "rust:1.70-slim",
-            "ruby" => "ruby:3.0-alpine",
-            "php" => "php:8.1-cli-alpine",
-            "c" => "gcc:latest",
-            "cpp" => "gcc:latest", 
-            "bash" => "ubuntu:22.04",
-            "shell" => "ubuntu:22.04",
-            _ => ""
-        };
+        return _dockerImages.TryGetValue(language, out var image) ? image : "";
     }
 }
\ No newline at end of file
@@ -1,171 +1,99 @@
+using System.Buffers;
+using System.Collections.Immutable;
 using System.Text.Json;
 
 namespace wcode.Lib;
 
 public class ProjectToolProvider
 {
-    public static List<Tool> CreateProjectTools(ProjectQueryService? queryService = null)
+    // The definitions only depend on whether a query service is available, so each set is built once at type initialization
+    private static readonly ImmutableList<Tool> _projectTools = BuildTools(includeProjectTools: true);
+    private static readonly ImmutableList<Tool> _systemTools = BuildTools(includeProjectTools: false);
+    
+    // Every caller gets the same immutable list, which lets OllamaClient serialize it once
+    public static IReadOnlyList<Tool> GetProjectTools(ProjectQueryService? queryService = null)
+    {
+        return queryService != null ? _projectTools : _systemTools;
+    }
+    
+    private static ImmutableList<Tool> BuildTools(bool includeProjectTools)
     {
         var tools = new List<Tool>();
         
         // Add project tools only if query service is available
-        if (queryService != null)
+        if (includeProjectTools)
         {
             tools.AddRange(new List<Tool>
             {
-                new Tool
-                {
-                    Type = "function",
-                    Function = new ToolFunction
-                    {
-                        Name = "read_file",
-                        Description = "Read the contents of a file in the project",
-                        Parameters = JsonSerializer.SerializeToElement(new
-                        {
-                            type = "object",
-                            properties = new
-                            {
-                                filename = new
-                                {
-                                    type = "string",
-                                    description = "The name or path of the file to read"
-                                }
-                            },
-                            required = new[] { "filename" }
-                        })
-                    }
-                },
-                new Tool
-                {
-                    Type = "function",
-                    Function = new ToolFunction
-                    {
-                        Name = "write_file",
-                        Description = "Write content to a file in the project",
-                        Parameters = JsonSerializer.SerializeToElement(new
-                        {
-                            type = "object",
-                            properties = new
-                            {
-                                filename = new
-                                {
-                                    type = "string",
-                                    description = "The name or path of the file to write"
-                                },
-                                content = new
-                                {
-                                    type = "string",
-                                    description = "The content to write to the file"
-                                }
-                            },
-                            required = new[] { "filename", "content" }
-                        })
-                    }
-                },
-                new Tool
-                {
-                    Type = "function",
-                    Function = new ToolFunction
-                    {
-                        Name = "list_files",
-                        Description = "List all files in the project directory",
-                        Parameters = JsonSerializer.SerializeToElement(new
-                        {
-                            type = "object",
-                            properties = new object(),
-                            required = new string[0]
-                        })
-                    }
-                },
-                new Tool
-                {
-                    Type = "function",
-                    Function = new ToolFunction
-                    {
-                        Name = "search_files",
-                        Description = "Search for content within project files",
-                        Parameters = JsonSerializer.SerializeToElement(new
-                        {
-                            type = "object",
-                            properties = new
-                            {
-                                query = new
-                                {
-                                    type = "string",
-                                    description = "The text to search for"
-                                }
-                            },
-                            required = new[] { "query" }
-                        })
-                    }
-                },
-                new Tool
-                {
-                    Type = "function",
-                    Function = new ToolFunction
-                    {
-                        Name = "get_project_structure",
-                        Description = "Get the overall structure of the project",
-                        Parameters = JsonSerializer.SerializeToElement(new
-                        {
-                            type = "object",
-                            properties = new object(),
-                            required = new string[0]
-                        })
-                    }
-                },
-                new Tool
-                {
-                    Type = "function",
-                    Function = new ToolFunction
-                    {
-                        Name = "run_command", 
-                        Description = "Run shell commands or programs in a secure Docker container. Supports shell operators like &&, ;, |, >, <",
-                        Parameters = JsonSerializer.SerializeToElement(new
-                        {
-                            type = "object",
-                            properties = new
-                            {
-                                command = new
-                                {
-                                    type = "string",
-                                    description = "The shell command to execute (supports &&, ;, |, >, < operators)"
-                                },
-                                language = new
-                                {
-                                    type = "string",
-                                    description = "The programming language (python, node, etc.)"
-                                },
-                                timeout = new
-                                {
-                                    type = "number",
-                                    description = "Timeout in seconds (default: 30)"
-                                }
-                            },
-                            required = new[] { "command", "language" }
-                        })
-                    }
-                }
+                CreateTool("read_file", "Read the contents of a file in the project",
+                    ("filename", "string", "The name or path of the file to read", true)),
+                CreateTool("write_file", "Write content to a file in the project",
+                    ("filename", "string", "The name or path of the file to write", true),
+                    ("content", "string", "The content to write to the file", true)),
+                CreateTool("list_files", "List all files in the project directory"),
+                CreateTool("search_files", "Search for content within project files",
+                    ("query", "string", "The text to search for", true)),
+                CreateTool("get_project_structure", "Get the overall structure of the project"),
+                CreateTool("run_command", "Run shell commands or programs in a secure Docker container. Supports shell operators like &&, ;, |, >, <",
+                    ("command", "string", "The shell command to execute (supports &&, ;, |, >, < operators)", true),
+                    ("language", "string", "The programming language (python, node, etc.)", true),
+                    ("timeout", "number", "Timeout in seconds (default: 30)", false))
             });
         }
         
         // Add a simple diagnostic tool that always works
-        tools.Add(new Tool
+        tools.Add(CreateTool("get_system_info", "Get information about the current system and available capabilities"));
+        
+        return tools.ToImmutableList();
+    }
+
+    private static Tool CreateTool(string name, string description, params (string Name, string Type, string Description, bool Required)[] parameters)
+    {
+        return new Tool
         {
             Type = "function",
             Function = new ToolFunction
             {
-                Name = "get_system_info",
-                Description = "Get information about the current system and available capabilities",
-                Parameters = JsonSerializer.SerializeToElement(new
+                Name = name,
+                Description = description,
+                Parameters = CreateObjectSchema(parameters)
+            }
+        };
+    }
+
+    private static JsonElement CreateObjectSchema((string Name, string Type, string Description, bool Required)[] parameters)
+    {
+        // Write the JSON schema directly instead of reflecting over an anonymous type
+        var buffer = new ArrayBufferWriter<byte>();
+        using (var writer = new Utf8JsonWriter(buffer))
+        {
+            writer.WriteStartObject();
+            writer.WriteString("type", "object");
+
+            writer.WriteStartObject("properties");
+            foreach (var parameter in parameters)
+            {
+                writer.WriteStartObject(parameter.Name);
+                writer.WriteString("type", parameter.Type);
+                writer.WriteString("description", parameter.Description);
+                writer.WriteEndObject();
+            }
+            writer.WriteEndObject();
+
+            writer.WriteStartArray("required");
+            foreach (var parameter in parameters)
+            {
+                if (parameter.Required)
                 {
-                    type = "object",
-                    properties = new object(),
-                    required = new string[0]
-                })
+                    writer.WriteStringValue(parameter.Name);
+                }
             }
-        });
-        
-        return tools;
+            writer.WriteEndArray();
+
+            writer.WriteEndObject();
+        }
+
+        using var document = JsonDocument.Parse(buffer.WrittenMemory);
+        return document.RootElement.Clone();
     }
 }
\ No newline at end of file
@@ -0,0 +1,100 @@
+using System.Numerics;
+
+namespace wcode.Lib;
+
+// Returns a previous response when a new prompt is close enough in meaning to one already answered
+// in the same conversation context (model, history and tools)
+internal sealed class SemanticResponseCache
+{
+    private readonly Dictionary<string, List<(float[] Embedding, byte[] ResponseBody)>> _entriesByContext = new();
+    private readonly object _lock = new();
+
+    public string EmbeddingModel { get; }
+    public double SimilarityThreshold { get; }
+
+    public SemanticResponseCache(string embeddingModel, double similarityThreshold)
+    {
+        EmbeddingModel = embeddingModel;
+        SimilarityThreshold = similarityThreshold;
+    }
+
+    public byte[]? Find(string contextKey, float[] embedding)
+    {
+        var query = Normalize(embedding);
+
+        lock (_lock)
+        {
+            if (!_entriesByContext.TryGetValue(contextKey, out var entries)) return null;
+
+            byte[]? bestResponse = null;
+            var bestSimilarity = SimilarityThreshold;
+
+            foreach (var entry in entries)
+            {
+                if (entry.Embedding.Length != query.Length) continue;
+
+                // Both vectors are unit length, so the dot product is the cosine similarity
+                var similarity = Dot(entry.Embedding, query);
+                if (similarity >= bestSimilarity)
+                {
+                    bestSimilarity = similarity;
+                    bestResponse = entry.ResponseBody;
+                }
+            }
+
+            return bestResponse;
+        }
+    }
+
+    public void Add(string contextKey, float[] embedding, byte[] responseBody)
+    {
+        var normalized = Normalize(embedding);
+
+        lock (_lock)
+        {
+            if (!_entriesByContext.TryGetValue(contextKey, out var entries))
+            {
+                entries = new List<(float[] Embedding, byte[] ResponseBody)>();
+                _entriesByContext[contextKey] = entries;
+            }
+
+            entries.Add((normalized, responseBody));
+        }
+    }
+
+    internal static float[] Normalize(float[] vector)
+    {
+        var length = MathF.Sqrt(Dot(vector, vector));
+        if (length == 0) return vector;
+
+        var result = new float[vector.Length];
+        for (int i = 0; i < vector.Length; i++)
+        {
+            result[i] = vector[i] / length;
+        }
+        return result;
+    }
+
+    internal static float Dot(ReadOnlySpan<float> a, ReadOnlySpan<float> b)
+    {
+        var sum = 0f;
+        int i = 0;
+
+        // Process as many elements per step as the hardware vector width allows
+        if (Vector.IsHardwareAccelerated && a.Length >= Vector<float>.Count)
+        {
+            var acc = Vector<float>.Zero;
+            for (; i <= a.Length - Vector<float>.Count; i += Vector<float>.Count)
+            {
+                acc += new Vector<float>(a.Slice(i)) * new Vector<float>(b.Slice(i));
+            }
+            sum = Vector.Dot(acc, Vector<float>.One);
+        }
+
+        for (; i < a.Length; i++)
+        {
+            sum += a[i] * b[i];
+        }
+        return sum;
+    }
+}
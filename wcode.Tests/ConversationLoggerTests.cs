@@ -0,0 +1,91 @@
+using wcode.Lib;
+
+namespace wcode.Tests;
+
+public class ConversationLoggerTests : IDisposable
+{
+    private readonly string _testProjectPath;
+
+    public ConversationLoggerTests()
+    {
+        _testProjectPath = Path.Combine(Path.GetTempPath(), "wcode_log_test_" + Guid.NewGuid().ToString("N")[..8]);
+        Directory.CreateDirectory(_testProjectPath);
+    }
+
+    [Fact]
+    public async Task LogConversation_AfterDispose_EntriesAreWrittenInOrder()
+    {
+        // Arrange
+        var logger = new ConversationLogger(_testProjectPath);
+
+        // Act
+        await logger.LogConversationAsync("User", "first message");
+        await logger.LogConversationAsync("Assistant", "second message", "test-model", 0, 42);
+        logger.Dispose();
+
+        // Assert
+        var markdown = ReadSharedLogFile("llm_conversations.md");
+        Assert.StartsWith("# LLM Conversations", markdown);
+        Assert.Contains("first message", markdown);
+        Assert.True(markdown.IndexOf("first message") < markdown.IndexOf("second message"));
+
+        var csvLines = ReadSharedLogFile("llm_conversations.csv").Split('\n', StringSplitOptions.RemoveEmptyEntries);
+        Assert.Equal(3, csvLines.Length);
+        Assert.Contains(",User,first message,", csvLines[1]);
+        Assert.EndsWith(",Assistant,second message,test-model,0,42", csvLines[2]);
+    }
+
+    [Fact]
+    public async Task LogConversation_SameLogger_SharesSessionId()
+    {
+        // Arrange
+        var logger = new ConversationLogger(_testProjectPath);
+
+        // Act
+        await logger.LogConversationAsync("User", "hello");
+        await logger.LogConversationAsync("Assistant", "hi");
+        logger.Dispose();
+
+        // Assert
+        var csvLines = ReadSharedLogFile("llm_conversations.csv").Split('\n', StringSplitOptions.RemoveEmptyEntries);
+        Assert.Equal(csvLines[1].Split(',')[1], csvLines[2].Split(',')[1]);
+    }
+
+    [Fact]
+    public async Task Dispose_LastLoggerForPath_ClosesLogFiles()
+    {
+        // Arrange
+        var first = new ConversationLogger(_testProjectPath);
+        var second = new ConversationLogger(_testProjectPath);
+
+        // Act
+        first.Dispose();
+        await second.LogConversationAsync("User", "still logging");
+        second.Dispose();
+
+        // Assert
+        Assert.Contains("still logging", ReadSharedLogFile("llm_conversations.md"));
+        foreach (var fileName in new[] { "llm_conversations.md", "llm_conversations.csv" })
+        {
+            // Opening without sharing fails while any logger still holds the file
+            using var stream = new FileStream(Path.Combine(_testProjectPath, fileName), FileMode.Open, FileAccess.ReadWrite, FileShare.None);
+        }
+    }
+
+    public void Dispose()
+    {
+        // Clean up test directory
+        if (Directory.Exists(_testProjectPath))
+        {
+            Directory.Delete(_testProjectPath, true);
+        }
+    }
+
+    private string ReadSharedLogFile(string fileName)
+    {
+        // The logger keeps its files open for appending, so allow shared access when reading them back
+        using var stream = new FileStream(Path.Combine(_testProjectPath, fileName), FileMode.Open, FileAccess.Read, FileShare.ReadWrite);
+        using var reader = new StreamReader(stream);
+        return reader.ReadToEnd();
+    }
+}
@@ -0,0 +1,298 @@
+using System.Buffers;
+using System.Text;
+using wcode.Lib;
+
+namespace wcode.Tests;
+
+public class OllamaClientTests
+{
+    [Fact]
+    public void ParseToolCallsFromContent_SingleJsonObject_ReturnsToolCall()
+    {
+        // Arrange
+        var content = "{\"name\": \"read_file\", \"arguments\": {\"filename\": \"readme.txt\"}}";
+
+        // Act
+        var toolCalls = OllamaClient.ParseToolCallsFromContent(content);
+
+        // Assert
+        Assert.Single(toolCalls);
+        Assert.Equal("read_file", toolCalls[0].Function.Name);
+        Assert.Equal("readme.txt", toolCalls[0].Function.Arguments.GetProperty("filename").GetString());
+    }
+
+    [Fact]
+    public void ParseToolCallsFromContent_MultiLineObjects_ReturnsAllToolCalls()
+    {
+        // Arrange
+        var content = """
+            {
+                "name": "write_file",
+                "arguments": {"filename": "hello.py", "content": "print('hi')"}
+            }
+            {"name": "run_command", "arguments": {"command": "python hello.py", "language": "python"}}
+            """;
+
+        // Act
+        var toolCalls = OllamaClient.ParseToolCallsFromContent(content);
+
+        // Assert
+        Assert.Equal(2, toolCalls.Count);
+        Assert.Equal("write_file", toolCalls[0].Function.Name);
+        Assert.Equal("run_command", toolCalls[1].Function.Name);
+    }
+
+    [Fact]
+    public void ParseToolCallsFromContent_TextAroundJson_ReturnsToolCall()
+    {
+        // Arrange
+        var content = """
+            I will list the files first.
+            {"name": "list_files", "arguments": {}}
+            """;
+
+        // Act
+        var toolCalls = OllamaClient.ParseToolCallsFromContent(content);
+
+        // Assert
+        Assert.Single(toolCalls);
+        Assert.Equal("list_files", toolCalls[0].Function.Name);
+    }
+
+    [Fact]
+    public void ParseToolCallsFromContent_PlainText_ReturnsNoToolCalls()
+    {
+        // Act
+        var toolCalls = OllamaClient.ParseToolCallsFromContent("The file has been written successfully.");
+
+        // Assert
+        Assert.Empty(toolCalls);
+    }
+
+    [Fact]
+    public async Task ReadStreamedChatResponse_CompleteStream_ReturnsAccumulatedContent()
+    {
+        // Arrange
+        var stream = CreateStream(
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"Hello\"},\"done\":false}\n" +
+            "{\"message\":{\"role\":\"assistant\",\"content\":\" world\"},\"done\":false}\n" +
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"\"},\"done\":true}\n");
+
+        // Act
+        var response = await OllamaClient.ReadStreamedChatResponseAsync(stream, null);
+
+        // Assert
+        Assert.NotNull(response);
+        Assert.True(response.Done);
+        Assert.Equal("Hello world", response.Message!.Content);
+    }
+
+    [Fact]
+    public async Task ReadStreamedChatResponse_ErrorChunk_ReturnsNull()
+    {
+        // Arrange
+        var stream = CreateStream(
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"Hel\"},\"done\":false}\n" +
+            "{\"error\":\"model runner has unexpectedly stopped\"}\n");
+
+        // Act
+        var response = await OllamaClient.ReadStreamedChatResponseAsync(stream, null);
+
+        // Assert
+        Assert.Null(response);
+    }
+
+    [Fact]
+    public async Task ReadStreamedChatResponse_StreamEndsBeforeDone_ReturnsNull()
+    {
+        // Arrange
+        var stream = CreateStream("{\"message\":{\"role\":\"assistant\",\"content\":\"Hel\"},\"done\":false}\n");
+
+        // Act
+        var response = await OllamaClient.ReadStreamedChatResponseAsync(stream, null);
+
+        // Assert
+        Assert.Null(response);
+    }
+
+    [Fact]
+    public async Task ReadChatChunks_LinesSplitAcrossReads_ParsesEveryChunk()
+    {
+        // Arrange
+        var stream = new TrickleStream(Encoding.UTF8.GetBytes(
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"one\"},\"done\":false}\n" +
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"two\"},\"done\":false}\r\n" +
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"\"},\"done\":true}\n"), bytesPerRead: 7);
+
+        // Act
+        var chunks = await ReadAllChunksAsync(stream);
+
+        // Assert
+        Assert.Equal(3, chunks.Count);
+        Assert.Equal("one", chunks[0].Message!.Content);
+        Assert.Equal("two", chunks[1].Message!.Content);
+        Assert.True(chunks[2].Done);
+    }
+
+    [Fact]
+    public async Task ReadChatChunks_MalformedLine_IsSkipped()
+    {
+        // Arrange
+        var stream = CreateStream(
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"before\"},\"done\":false}\n" +
+            "{not json\n" +
+            "\n" +
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"after\"},\"done\":true}\n");
+
+        // Act
+        var chunks = await ReadAllChunksAsync(stream);
+
+        // Assert
+        Assert.Equal(2, chunks.Count);
+        Assert.Equal("before", chunks[0].Message!.Content);
+        Assert.Equal("after", chunks[1].Message!.Content);
+    }
+
+    [Fact]
+    public async Task ReadChatChunks_UnterminatedLastLine_IsParsed()
+    {
+        // Arrange
+        var stream = CreateStream(
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"first\"},\"done\":false}\n" +
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"last\"},\"done\":true}");
+
+        // Act
+        var chunks = await ReadAllChunksAsync(stream);
+
+        // Assert
+        Assert.Equal(2, chunks.Count);
+        Assert.Equal("last", chunks[1].Message!.Content);
+        Assert.True(chunks[1].Done);
+    }
+
+    [Fact]
+    public async Task ReadChatChunks_LineLargerThanBuffer_IsParsedWhole()
+    {
+        // Arrange
+        var largeContent = new string('x', 200 * 1024);
+        var stream = new TrickleStream(Encoding.UTF8.GetBytes(
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"start\"},\"done\":false}\n" +
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"" + largeContent + "\"},\"done\":false}\n" +
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"end\"},\"done\":true}\n"), bytesPerRead: 4096);
+        var pool = new TrackingArrayPool();
+
+        // Act
+        var chunks = new List<ChatResponse>();
+        await foreach (var chunk in OllamaClient.ReadChatChunksAsync(stream, bufferPool: pool))
+        {
+            chunks.Add(chunk);
+        }
+
+        // Assert
+        Assert.True(pool.RentCount > 1);
+        Assert.Equal(0, pool.OutstandingCount);
+        Assert.Equal(3, chunks.Count);
+        Assert.Equal(largeContent, chunks[1].Message!.Content);
+        Assert.Equal("end", chunks[2].Message!.Content);
+    }
+
+    [Fact]
+    public async Task ReadChatChunks_StoppedEarly_ReturnsBufferOnce()
+    {
+        // Arrange
+        var stream = CreateStream(
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"a\"},\"done\":false}\n" +
+            "{\"message\":{\"role\":\"assistant\",\"content\":\"b\"},\"done\":true}\n");
+        var pool = new TrackingArrayPool();
+        var chunks = new List<ChatResponse>();
+
+        // Act
+        await foreach (var chunk in OllamaClient.ReadChatChunksAsync(stream, bufferPool: pool))
+        {
+            chunks.Add(chunk);
+            Assert.Equal(1, pool.OutstandingCount);
+            break;
+        }
+
+        // Assert
+        Assert.Single(chunks);
+        Assert.Equal(1, pool.RentCount);
+        Assert.Equal(0, pool.OutstandingCount);
+    }
+
+    [Fact]
+    public void GetSemanticContextKey_MutableToolListChanges_KeyChanges()
+    {
+        // Arrange
+        using var client = new OllamaClient();
+        var history = new List<ChatMessage> { new() { Role = "user", Content = "hello" } };
+        var tools = new List<Tool>(ProjectToolProvider.GetProjectTools());
+        var before = client.GetSemanticContextKey("model", history, tools);
+
+        // Act
+        tools.Add(tools[0]);
+        var after = client.GetSemanticContextKey("model", history, tools);
+
+        // Assert
+        Assert.NotEqual(before, after);
+    }
+
+    private static MemoryStream CreateStream(string content)
+    {
+        return new MemoryStream(Encoding.UTF8.GetBytes(content));
+    }
+
+    private static async Task<List<ChatResponse>> ReadAllChunksAsync(Stream stream)
+    {
+        var chunks = new List<ChatResponse>();
+        await foreach (var chunk in OllamaClient.ReadChatChunksAsync(stream))
+        {
+            chunks.Add(chunk);
+        }
+        return chunks;
+    }
+
+    // Hands out fresh arrays and fails the test if one is returned that is not currently rented
+    private sealed class TrackingArrayPool : ArrayPool<byte>
+    {
+        private readonly HashSet<byte[]> _outstanding = new();
+
+        public int RentCount { get; private set; }
+
+        public int OutstandingCount => _outstanding.Count;
+
+        public override byte[] Rent(int minimumLength)
+        {
+            var array = new byte[minimumLength];
+            _outstanding.Add(array);
+            RentCount++;
+            return array;
+        }
+
+        public override void Return(byte[] array, bool clearArray = false)
+        {
+            Assert.True(_outstanding.Remove(array), "Returned an array that was not rented or was already returned");
+        }
+    }
+
+    // Returns at most a few bytes per read, like a network stream delivering small packets
+    private sealed class TrickleStream : MemoryStream
+    {
+        private readonly int _bytesPerRead;
+
+        public TrickleStream(byte[] content, int bytesPerRead) : base(content)
+        {
+            _bytesPerRead = bytesPerRead;
+        }
+
+        public override int Read(byte[] buffer, int offset, int count)
+        {
+            return base.Read(buffer, offset, Math.Min(count, _bytesPerRead));
+        }
+
+        public override ValueTask<int> ReadAsync(Memory<byte> buffer, CancellationToken cancellationToken = default)
+        {
+            return base.ReadAsync(buffer[..Math.Min(buffer.Length, _bytesPerRead)], cancellationToken);
+        }
+    }
+}
@@ -0,0 +1,166 @@
+using wcode.Cli;
+using wcode.Lib;
+
+namespace wcode.Tests;
+
+public class ProgramTests
+{
+    [Fact]
+    public void ParseCommandLineArguments_ContinueConversation_SetsFlag()
+    {
+        // Act
+        var options = Program.ParseCommandLineArguments(new[] { "batch.txt", "--continue-conversation" });
+
+        // Assert
+        Assert.True(options.ContinueConversation);
+        Assert.Equal("batch.txt", options.BatchFile);
+        Assert.Equal(1, options.MaxParallelPrompts);
+    }
+
+    [Theory]
+    [InlineData(new[] { "--parallel", "4" }, 4)]
+    [InlineData(new[] { "--parallel=4" }, 4)]
+    [InlineData(new[] { "--parallel", "all" }, int.MaxValue)]
+    [InlineData(new[] { "--parallel=0" }, 0)]
+    [InlineData(new[] { "--parallel", "many" }, 0)]
+    public void ParseCommandLineArguments_Parallel_ParsesLimit(string[] args, int expected)
+    {
+        // Act
+        var options = Program.ParseCommandLineArguments(args);
+
+        // Assert
+        Assert.Equal(expected, options.MaxParallelPrompts);
+    }
+
+    [Theory]
+    [InlineData("--model", "qwen2.5:7b")]
+    [InlineData("--model=qwen2.5:7b")]
+    public void ParseCommandLineArguments_Model_SetsModelName(params string[] args)
+    {
+        // Act
+        var options = Program.ParseCommandLineArguments(args);
+
+        // Assert
+        Assert.Equal("qwen2.5:7b", options.ModelName);
+    }
+
+    [Fact]
+    public void ValidateOptions_ContinueConversationWithParallel_ReturnsError()
+    {
+        // Arrange
+        var options = Program.ParseCommandLineArguments(new[] { "batch.txt", "--continue-conversation", "--parallel", "2" });
+
+        // Act
+        var error = Program.ValidateOptions(options);
+
+        // Assert
+        Assert.Equal("--continue-conversation cannot be combined with --parallel", error);
+    }
+
+    [Fact]
+    public void ValidateOptions_ContinueConversationSequential_ReturnsNull()
+    {
+        // Arrange
+        var options = Program.ParseCommandLineArguments(new[] { "batch.txt", "--continue-conversation" });
+
+        // Act
+        var error = Program.ValidateOptions(options);
+
+        // Assert
+        Assert.Null(error);
+    }
+
+    [Fact]
+    public void ValidateOptions_InvalidParallelLimit_ReturnsError()
+    {
+        // Arrange
+        var options = Program.ParseCommandLineArguments(new[] { "batch.txt", "--parallel", "0" });
+
+        // Act
+        var error = Program.ValidateOptions(options);
+
+        // Assert
+        Assert.Equal("--parallel requires a positive number or 'all'", error);
+    }
+
+    [Theory]
+    [InlineData("localhost:11434")]
+    [InlineData("ftp://localhost:11434")]
+    [InlineData("not a url")]
+    public void ValidateOptions_ServerUrlNotHttp_ReturnsError(string serverUrl)
+    {
+        // Arrange
+        var options = Program.ParseCommandLineArguments(new[] { "batch.txt", "--server", serverUrl });
+
+        // Act
+        var error = Program.ValidateOptions(options);
+
+        // Assert
+        Assert.Equal($"Invalid server URL: {serverUrl} (expected an http:// or https:// URL)", error);
+    }
+
+    [Theory]
+    [InlineData("http://localhost:11434")]
+    [InlineData("https://ollama.example.com/")]
+    public void ValidateOptions_HttpServerUrl_ReturnsNull(string serverUrl)
+    {
+        // Arrange
+        var options = Program.ParseCommandLineArguments(new[] { "batch.txt", "--server=" + serverUrl });
+
+        // Act
+        var error = Program.ValidateOptions(options);
+
+        // Assert
+        Assert.Null(error);
+    }
+
+    [Fact]
+    public void EstimateResponseCost_ArithmeticPrompt_SortsAheadOfCodingPrompt()
+    {
+        // Arrange
+        var prompts = new[] { "Write a Python program that prints the primes below 100", "What is 17 * 23?" };
+
+        // Act
+        var ordered = prompts.OrderBy(Program.EstimateResponseCost).ToList();
+
+        // Assert
+        Assert.Equal("What is 17 * 23?", ordered[0]);
+        Assert.True(Program.EstimateResponseCost("Implement a linked list") > Program.EstimateResponseCost("What is 17 * 23?"));
+    }
+
+    [Theory]
+    [InlineData("What is the current time in Tokyo?")]
+    [InlineData("Decode this base64 string: aGVsbG8=")]
+    [InlineData("Why does truncate lose precision?")]
+    public void EstimateResponseCost_KeywordInsideLongerWord_DoesNotCountAsLong(string prompt)
+    {
+        // Act
+        var cost = Program.EstimateResponseCost(prompt);
+
+        // Assert
+        Assert.Equal(prompt.Length, cost);
+    }
+
+    [Fact]
+    public async Task ProcessPromptAsync_ContinuingConversationNotAnswered_LeavesHistoryUnchanged()
+    {
+        // Arrange
+        // Nothing listens on port 1, so the request fails without a response
+        using var client = new OllamaClient(new Uri("http://127.0.0.1:1")) { DebugRequestPath = null };
+        var history = new List<ChatMessage>
+        {
+            new() { Role = "user", Content = "first prompt" },
+            new() { Role = "assistant", Content = "first answer" }
+        };
+        using var output = new StringWriter();
+
+        // Act
+        await Program.ProcessPromptAsync(client, "model", "second prompt", 1, 2, ProjectToolProvider.GetProjectTools(),
+            new ProjectToolExecutor(), output, history);
+
+        // Assert
+        Assert.Equal(2, history.Count);
+        Assert.Equal("assistant", history[^1].Role);
+        Assert.Contains("No response received from LLM", output.ToString());
+    }
+}
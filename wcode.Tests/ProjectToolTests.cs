@@ -316,10 +316,10 @@ class Program
     }
 
     [Fact]
-    public void ProjectToolProvider_CreateTools_ReturnsExpectedTools()
+    public void ProjectToolProvider_GetTools_ReturnsExpectedTools()
     {
         // Act
-        var tools = ProjectToolProvider.CreateProjectTools(_queryService);
+        var tools = ProjectToolProvider.GetProjectTools(_queryService);
 
         // Assert
         Assert.Equal(7, tools.Count);
@@ -336,13 +336,51 @@ class Program
     public void ProjectToolProvider_NoQueryService_ReturnsOnlySystemInfo()
     {
         // Act
-        var tools = ProjectToolProvider.CreateProjectTools(null);
+        var tools = ProjectToolProvider.GetProjectTools(null);
 
         // Assert
         Assert.Single(tools);
         Assert.Equal("get_system_info", tools[0].Function.Name);
     }
 
+    [Fact]
+    public void ProjectToolProvider_RepeatedCalls_ReuseToolDefinitions()
+    {
+        // Act
+        var first = ProjectToolProvider.GetProjectTools(_queryService);
+        var second = ProjectToolProvider.GetProjectTools(_queryService);
+
+        // Assert
+        Assert.Same(first, second);
+        Assert.NotSame(first, ProjectToolProvider.GetProjectTools(null));
+    }
+
+    [Fact]
+    public void ProjectToolProvider_SharedTools_CannotBeModified()
+    {
+        // Act
+        var tools = (IList<Tool>)ProjectToolProvider.GetProjectTools(_queryService);
+
+        // Assert
+        Assert.True(tools.IsReadOnly);
+        Assert.Throws<NotSupportedException>(() => tools.Add(tools[0]));
+        Assert.Throws<NotSupportedException>(() => tools.RemoveAt(0));
+    }
+
+    [Fact]
+    public void ProjectToolProvider_RunCommandSchema_ListsOnlyRequiredParameters()
+    {
+        // Act
+        var tools = ProjectToolProvider.GetProjectTools(_queryService);
+        var parameters = tools.Single(t => t.Function.Name == "run_command").Function.Parameters;
+
+        // Assert
+        Assert.Equal("object", parameters.GetProperty("type").GetString());
+        Assert.Equal("number", parameters.GetProperty("properties").GetProperty("timeout").GetProperty("type").GetString());
+        var required = parameters.GetProperty("required").EnumerateArray().Select(e => e.GetString()).ToList();
+        Assert.Equal(new[] { "command", "language" }, required);
+    }
+
     private static ToolCall CreateToolCall(string functionName, object arguments)
     {
         return new ToolCall
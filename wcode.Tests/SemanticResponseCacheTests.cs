@@ -0,0 +1,159 @@
+using System.Numerics;
+using System.Text;
+using wcode.Lib;
+
+namespace wcode.Tests;
+
+public class SemanticResponseCacheTests
+{
+    [Fact]
+    public void Dot_LengthNotMultipleOfVectorWidth_MatchesScalarSum()
+    {
+        // Arrange
+        foreach (var length in new[] { 1, Vector<float>.Count - 1, Vector<float>.Count + 1, 3 * Vector<float>.Count + 5 })
+        {
+            var a = Enumerable.Range(0, length).Select(i => (float)(i + 1)).ToArray();
+            var b = Enumerable.Range(0, length).Select(i => (float)(length - i)).ToArray();
+            var expected = 0f;
+            for (int i = 0; i < length; i++)
+            {
+                expected += a[i] * b[i];
+            }
+
+            // Act
+            var actual = SemanticResponseCache.Dot(a, b);
+
+            // Assert
+            Assert.Equal(expected, actual, 3);
+        }
+    }
+
+    [Fact]
+    public void Normalize_NonZeroVector_ReturnsUnitLength()
+    {
+        // Act
+        var normalized = SemanticResponseCache.Normalize(new[] { 3f, 4f });
+
+        // Assert
+        Assert.Equal(0.6f, normalized[0], 5);
+        Assert.Equal(0.8f, normalized[1], 5);
+    }
+
+    [Fact]
+    public void Normalize_ZeroVector_ReturnsItUnchanged()
+    {
+        // Arrange
+        var zero = new float[3];
+
+        // Act
+        var normalized = SemanticResponseCache.Normalize(zero);
+
+        // Assert
+        Assert.All(normalized, value => Assert.Equal(0f, value));
+    }
+
+    [Fact]
+    public void Find_SimilarityAboveThreshold_ReturnsResponse()
+    {
+        // Arrange
+        var cache = new SemanticResponseCache("embed", 0.92);
+        cache.Add("context", new[] { 1f, 0f }, Encoding.UTF8.GetBytes("cached"));
+
+        // Act (cosine similarity 0.95)
+        var response = cache.Find("context", new[] { 0.95f, MathF.Sqrt(1 - 0.95f * 0.95f) });
+
+        // Assert
+        Assert.NotNull(response);
+        Assert.Equal("cached", Encoding.UTF8.GetString(response));
+    }
+
+    [Fact]
+    public void Find_SimilarityBelowThreshold_ReturnsNull()
+    {
+        // Arrange
+        var cache = new SemanticResponseCache("embed", 0.92);
+        cache.Add("context", new[] { 1f, 0f }, Encoding.UTF8.GetBytes("cached"));
+
+        // Act (cosine similarity 0.9)
+        var response = cache.Find("context", new[] { 0.9f, MathF.Sqrt(1 - 0.9f * 0.9f) });
+
+        // Assert
+        Assert.Null(response);
+    }
+
+    [Fact]
+    public void Find_SeveralMatches_ReturnsMostSimilar()
+    {
+        // Arrange
+        var cache = new SemanticResponseCache("embed", 0.5);
+        cache.Add("context", new[] { 1f, 1f }, Encoding.UTF8.GetBytes("close"));
+        cache.Add("context", new[] { 1f, 0.1f }, Encoding.UTF8.GetBytes("closest"));
+
+        // Act
+        var response = cache.Find("context", new[] { 1f, 0f });
+
+        // Assert
+        Assert.Equal("closest", Encoding.UTF8.GetString(response!));
+    }
+
+    [Fact]
+    public void Find_UnknownContext_ReturnsNull()
+    {
+        // Arrange
+        var cache = new SemanticResponseCache("embed", 0.92);
+        cache.Add("context", new[] { 1f, 0f }, Encoding.UTF8.GetBytes("cached"));
+
+        // Act
+        var response = cache.Find("other context", new[] { 1f, 0f });
+
+        // Assert
+        Assert.Null(response);
+    }
+
+    [Fact]
+    public void Find_EmptyCache_ReturnsNull()
+    {
+        // Arrange
+        var cache = new SemanticResponseCache("embed", 0.92);
+
+        // Act
+        var response = cache.Find("context", new[] { 1f, 0f });
+
+        // Assert
+        Assert.Null(response);
+    }
+
+    [Fact]
+    public void GetSemanticContextKey_NoHistory_ReturnsNull()
+    {
+        // Arrange
+        using var client = new OllamaClient();
+
+        // Act
+        var withoutHistory = client.GetSemanticContextKey("model", null, null);
+        var withEmptyHistory = client.GetSemanticContextKey("model", new List<ChatMessage>(), null);
+
+        // Assert
+        Assert.Null(withoutHistory);
+        Assert.Null(withEmptyHistory);
+    }
+
+    [Fact]
+    public void GetSemanticContextKey_DifferentHistories_ReturnsDifferentKeys()
+    {
+        // Arrange
+        using var client = new OllamaClient();
+        var factorial = new List<ChatMessage> { new() { Role = "user", Content = "Write a factorial in Python" } };
+        var fibonacci = new List<ChatMessage> { new() { Role = "user", Content = "Write a fibonacci in Python" } };
+
+        // Act
+        var factorialKey = client.GetSemanticContextKey("model", factorial, null);
+        var fibonacciKey = client.GetSemanticContextKey("model", fibonacci, null);
+        var factorialAgainKey = client.GetSemanticContextKey("model", new List<ChatMessage>(factorial), null);
+
+        // Assert
+        Assert.NotNull(factorialKey);
+        Assert.NotEqual(factorialKey, fibonacciKey);
+        Assert.Equal(factorialKey, factorialAgainKey);
+    }
+}
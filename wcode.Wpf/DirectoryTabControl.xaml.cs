@@ -20,6 +20,39 @@ public partial class DirectoryTabControl : UserControl
         public bool IsDirectory { get; set; }
     }
 
+    // Extension tables are built once and matched case-insensitively
+    private static readonly HashSet<string> _binaryExtensions = new(StringComparer.OrdinalIgnoreCase)
+    {
+        // Executables and libraries
+        ".exe", ".dll", ".so", ".dylib", ".bin", ".app",
+        
+        // Images
+        ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".ico", ".svg", ".webp",
+        
+        // Audio/Video
+        ".mp3", ".wav", ".flac", ".m4a", ".mp4", ".avi", ".mkv", ".mov", ".wmv",
+        
+        // Archives
+        ".zip", ".rar", ".7z", ".tar", ".gz", ".bz2",
+        
+        // Documents
+        ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+        
+        // Databases
+        ".db", ".sqlite", ".mdb",
+        
+        // Other binary formats
+        ".obj", ".o", ".lib", ".a", ".pdb", ".ilk", ".exp"
+    };
+    
+    private static readonly HashSet<string> _textExtensions = new(StringComparer.OrdinalIgnoreCase)
+    {
+        ".cs", ".cpp", ".c", ".h", ".hpp", ".java", ".js", ".ts", ".py", ".rb", ".php",
+        ".html", ".htm", ".css", ".scss", ".sass", ".xml", ".json", ".yaml", ".yml",
+        ".txt", ".md", ".sql", ".sh", ".bat", ".ps1", ".vb", ".fs", ".go", ".rs",
+        ".swift", ".kt", ".scala", ".clj", ".pl", ".r", ".m", ".mm", ".xaml"
+    };
+
     private ObservableCollection<DirectoryItem> _items = new();
     private string? _currentPath;
     
@@ -46,7 +79,9 @@ public partial class DirectoryTabControl : UserControl
     {
         if (_currentPath == null) return;
 
-        _items.Clear();
+        // Build the listing off to the side and hand it to the view once; adding to the bound
+        // collection item by item raises a change notification and layout pass for every entry
+        var items = new List<DirectoryItem>();
 
         try
         {
@@ -56,7 +91,7 @@ public partial class DirectoryTabControl : UserControl
             {
                 if (!dir.Name.StartsWith("."))
                 {
-                    _items.Add(new DirectoryItem
+                    items.Add(new DirectoryItem
                     {
                         Name = dir.Name,
                         Path = dir.FullName,
@@ -69,7 +104,7 @@ public partial class DirectoryTabControl : UserControl
 
             foreach (var file in dirInfo.GetFiles().OrderBy(f => f.Name))
             {
-                _items.Add(new DirectoryItem
+                items.Add(new DirectoryItem
                 {
                     Name = file.Name,
                     Path = file.FullName,
@@ -84,6 +119,9 @@ public partial class DirectoryTabControl : UserControl
             MessageBox.Show($"Error loading directory: {ex.Message}", "Error", 
                           MessageBoxButton.OK, MessageBoxImage.Error);
         }
+        
+        _items = new ObservableCollection<DirectoryItem>(items);
+        DirectoryItemsControl.ItemsSource = _items;
     }
 
     private string GetFileIcon(string extension)
@@ -146,45 +184,11 @@ public partial class DirectoryTabControl : UserControl
     
     private bool IsBinaryFile(string filePath)
     {
-        var extension = Path.GetExtension(filePath).ToLower();
-        var binaryExtensions = new[]
-        {
-            // Executables and libraries
-            ".exe", ".dll", ".so", ".dylib", ".bin", ".app",
-            
-            // Images
-            ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".ico", ".svg", ".webp",
-            
-            // Audio/Video
-            ".mp3", ".wav", ".flac", ".m4a", ".mp4", ".avi", ".mkv", ".mov", ".wmv",
-            
-            // Archives
-            ".zip", ".rar", ".7z", ".tar", ".gz", ".bz2",
-            
-            // Documents
-            ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
-            
-            // Databases
-            ".db", ".sqlite", ".mdb",
-            
-            // Other binary formats
-            ".obj", ".o", ".lib", ".a", ".pdb", ".ilk", ".exp"
-        };
-        
-        return Array.IndexOf(binaryExtensions, extension) >= 0;
+        return _binaryExtensions.Contains(Path.GetExtension(filePath));
     }
     
     private bool IsTextFile(string filePath)
     {
-        var extension = Path.GetExtension(filePath).ToLower();
-        var textExtensions = new[]
-        {
-            ".cs", ".cpp", ".c", ".h", ".hpp", ".java", ".js", ".ts", ".py", ".rb", ".php",
-            ".html", ".htm", ".css", ".scss", ".sass", ".xml", ".json", ".yaml", ".yml",
-            ".txt", ".md", ".sql", ".sh", ".bat", ".ps1", ".vb", ".fs", ".go", ".rs",
-            ".swift", ".kt", ".scala", ".clj", ".pl", ".r", ".m", ".mm", ".xaml"
-        };
-        
-        return Array.IndexOf(textExtensions, extension) >= 0;
+        return _textExtensions.Contains(Path.GetExtension(filePath));
     }
 }
\ No newline at end of file
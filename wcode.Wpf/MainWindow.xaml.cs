@@ -188,6 +188,12 @@ public partial class MainWindow : Window
             }
             
             FileTabControl.Items.Remove(tabItem);
+            
+            // Unloaded also fires when switching tabs, so release tab resources only on close
+            if (tabItem.Content is IDisposable disposable)
+            {
+                disposable.Dispose();
+            }
         }
     }
 
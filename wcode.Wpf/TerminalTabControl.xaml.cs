@@ -1,12 +1,14 @@
 using System;
 using System.Collections.Generic;
 using System.Collections.ObjectModel;
+using System.Diagnostics;
 using System.Windows;
 using System.Windows.Controls;
 using System.Windows.Input;
 using System.Windows.Media;
 using System.ComponentModel;
 using System.IO;
+using System.Text;
 using System.Text.Json;
 using System.Linq;
 using System.Threading.Tasks;
@@ -14,7 +16,7 @@ using wcode.Lib;
 
 namespace wcode.Wpf;
 
-public partial class TerminalTabControl : UserControl
+public partial class TerminalTabControl : UserControl, IDisposable
 {
     public class ChatMessage : INotifyPropertyChanged
     {
@@ -47,6 +49,12 @@ public partial class TerminalTabControl : UserControl
         }
     }
 
+    // Shared so System.Text.Json can reuse its cached serialization metadata between log entries
+    private static readonly JsonSerializerOptions _indentedJsonOptions = new() { WriteIndented = true };
+    
+    // Streamed responses refresh the chat bubble at most this often
+    private const int StreamingUpdateIntervalMs = 50;
+
     private ObservableCollection<ChatMessage> _messages = new();
     private OllamaClient? _ollamaClient;
     private List<wcode.Lib.ChatMessage> _conversationHistory = new();
@@ -65,6 +73,13 @@ public partial class TerminalTabControl : UserControl
         InitializeLogging();
     }
 
+    public void Dispose()
+    {
+        // Flushes queued entries and releases the logger's writer task
+        _conversationLogger?.Dispose();
+        _conversationLogger = null;
+    }
+
     private void InitializeLogging()
     {
         try
@@ -91,11 +106,12 @@ public partial class TerminalTabControl : UserControl
         
         AddSystemMessage("Connecting to Ollama server...");
         
-        _isConnected = await _ollamaClient.IsServerAvailableAsync();
+        // Listing the models doubles as the connection check
+        var models = await _ollamaClient.ConnectAndListModelsAsync();
+        _isConnected = models != null;
         
-        if (_isConnected)
+        if (models != null)
         {
-            var models = await _ollamaClient.GetModelsAsync();
             if (models.Any())
             {
                 _currentModel = models.First().Name;
@@ -187,7 +203,7 @@ public partial class TerminalTabControl : UserControl
         _conversationHistory.Add(new wcode.Lib.ChatMessage { Role = "user", Content = userMessage });
         
         // Create project tools using library
-        var tools = ProjectToolProvider.CreateProjectTools(_queryService);
+        var tools = ProjectToolProvider.GetProjectTools(_queryService);
         _toolExecutor = new ProjectToolExecutor(_queryService);
         
         // Debug: Log tool creation
@@ -239,7 +255,7 @@ public partial class TerminalTabControl : UserControl
                         }).ToArray()
                     };
                     
-                    var messageJson = JsonSerializer.Serialize(userMessageWithTools, new JsonSerializerOptions { WriteIndented = true });
+                    var messageJson = JsonSerializer.Serialize(userMessageWithTools, _indentedJsonOptions);
                     await _conversationLogger.LogConversationAsync("User", messageJson);
                 }
             }
@@ -313,12 +329,12 @@ public partial class TerminalTabControl : UserControl
                     }
                     else
                     {
-                        var resultText = "";
+                        var resultText = new StringBuilder();
                         for (int i = 0; i < toolResults.Count; i++)
                         {
-                            resultText += $"Tool '{response.Message.ToolCalls[i].Function.Name}' result:\n{toolResults[i]}\n\n";
+                            resultText.Append($"Tool '{response.Message.ToolCalls[i].Function.Name}' result:\n{toolResults[i]}\n\n");
                         }
-                        fullResponse = resultText.TrimEnd();
+                        fullResponse = resultText.ToString().TrimEnd();
                     }
                 }
                 else
@@ -372,7 +388,7 @@ public partial class TerminalTabControl : UserControl
                                 final_response = fullResponse
                             };
                             
-                            var responseJson = JsonSerializer.Serialize(completeResponse, new JsonSerializerOptions { WriteIndented = true });
+                            var responseJson = JsonSerializer.Serialize(completeResponse, _indentedJsonOptions);
                             await _conversationLogger.LogConversationAsync("Assistant", responseJson, _currentModel, 0, responseTime);
                         }
                     }
@@ -518,21 +534,29 @@ public partial class TerminalTabControl : UserControl
         
         try
         {
-            var fullResponse = "";
+            var streamedResponse = new StringBuilder();
             var hasReceivedData = false;
+            var sinceUpdate = Stopwatch.StartNew();
             
             await foreach (var chunk in _ollamaClient.ChatStreamAsync(_currentModel, contextMessage, _conversationHistory.Take(_conversationHistory.Count - 1).ToList()))
             {
                 hasReceivedData = true;
-                fullResponse += chunk;
+                streamedResponse.Append(chunk);
                 
-                await Dispatcher.InvokeAsync(() =>
+                // Refresh the display at a fixed rate rather than per token, and never hold up reading the stream
+                if (sinceUpdate.ElapsedMilliseconds >= StreamingUpdateIntervalMs)
                 {
-                    responseMessage.Message = fullResponse;
+                    responseMessage.Message = streamedResponse.ToString();
                     ScrollToBottom();
-                }, System.Windows.Threading.DispatcherPriority.Normal);
-                
-                await Task.Delay(50);
+                    sinceUpdate.Restart();
+                }
+            }
+            
+            var fullResponse = streamedResponse.ToString();
+            if (hasReceivedData)
+            {
+                responseMessage.Message = fullResponse;
+                ScrollToBottom();
             }
             
             if (!hasReceivedData)